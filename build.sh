@@ -78,6 +78,7 @@ echo -n "🐍 Compiling Dynamic Binary..."
                 --collect-all rich \
                 --exclude-module argcomplete.scripts \
                 --hidden-import argcomplete \
+                --hidden-import yaml._yaml \
                 --collect-all ruamel.yaml \
                 --hidden-import ruamel.yaml \
                 --exclude-module _ruamel_yaml_clib \
@@ -30,6 +30,7 @@ setup(
     
     # Dependencies aligned with production scripts
     install_requires=[
+        "PyYAML>=6.0.1",
         "ruamel.yaml>=0.17.21",
         "rich>=13.7.0",
         "argcomplete>=3.0.0",
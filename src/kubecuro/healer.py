@@ -5,20 +5,112 @@ AUTHOR:      Nishar A Sunkesala / FixMyK8s
 PURPOSE:      The Healer Engine: Syntax Repair, API Migration, & Security Patching.
 --------------------------------------------------------------------------------
 """
+import os
 import sys
 import re
-import os
 import logging
-from typing import Tuple, Union, Optional, Set
+from typing import FrozenSet, List, Tuple, Union, Optional, Set
 from io import StringIO
+from functools import lru_cache
 from ruamel.yaml import YAML
+from ruamel.yaml.error import YAMLError
 from kubecuro.shield import Shield, RegexShield
+from kubecuro.utils.result_cache import ResultCache
+from kubecuro.utils.yaml_io import line_load, read_manifest
 
 logger = logging.getLogger(__name__)
 
+# --- PRE-COMPILED REPAIR PATTERNS ---
+_K8S_KEYS = r"(?:image|name|containerPort|hostPort|protocol|imagePullPolicy|kind|apiVersion|labels)"
+_RE_MISSING_COLON = re.compile(rf'^[ \t]*{_K8S_KEYS}[ \t]+[\'"\[\w]')
+_RE_COLON_INJECT = re.compile(rf'^([ \t]*)({_K8S_KEYS})[ \t]+')
+_RE_MEM_QUANTITY = re.compile(r'(\d+)([a-z]*)')
+
+# Defect signatures: a document matching none of these skips the repair pipeline
+_RE_KEY_NO_COLON = re.compile(rf'^[ \t]*{_K8S_KEYS}[ \t]+[\'"\[\w][^:\n]*$', re.MULTILINE)
+_RE_ODD_INDENT = re.compile(r'^(?:  )* \S', re.MULTILINE)
+_RE_IMAGE_DEFECT = re.compile(r'image:\s*(?:"[^"]+"\s*:|[:\s]{2,})')
+_UNPARSED = object()
+# Trailing whitespace, or a separator str.splitlines() would turn into '\n'
+_RE_UNSTABLE_EOL = re.compile(r'[^\S\n]$|[\r\x0b\x0c\x1c-\x1e\x85\u2028\u2029]', re.MULTILINE)
+
+# --- KIND & SIGNATURE TABLES (built once, not per call) ---
+_WORKLOAD_KINDS = frozenset({'Deployment', 'Pod', 'StatefulSet', 'DaemonSet', 'Job', 'CronJob'})
+_TEMPLATE_KINDS = frozenset({'Deployment', 'StatefulSet', 'DaemonSet'})
+_SELECTOR_TARGETS = ('Deployment', 'StatefulSet', 'DaemonSet', 'Pod')  # Lookup order matters
+_DUMMY_SIGNATURES = ('sleep ', 'tail -f /dev/null', 'pause', 'infinity')
+_SIDECAR_SIGNATURES = ('istio-proxy', 'envoy', 'fluentd', 'sidecar', 'otel-collector')
+# Default limits per container role (read-only; values are copied into the manifest)
+_PROFILE_DUMMY = {'cpu': '10m', 'memory': '32Mi'}
+_PROFILE_SIDECAR = {'cpu': '100m', 'memory': '128Mi'}
+_PROFILE_SECONDARY = {'cpu': '200m', 'memory': '192Mi'}
+_PROFILE_PRIMARY = {'cpu': '500m', 'memory': '256Mi'}
+_SCHEMA_REQUIREMENTS = {
+    'Pod': ('spec',),
+    'Deployment': ('spec',),
+    'Service': ('spec',),
+    'StatefulSet': ('spec',),
+    'DaemonSet': ('spec',),
+    'ConfigMap': ('data', 'binaryData'),
+    'Secret': ('data', 'stringData'),
+    'Ingress': ('spec',),
+    'Namespace': ()
+}
+
+def _pod_spec(doc: dict, kind: str) -> Optional[dict]:
+    """Walks a workload to its pod spec with direct subscripts. None when absent or malformed."""
+    try:
+        spec = doc['spec']
+        if kind == 'Pod':
+            t_spec = spec
+        elif kind == 'CronJob':
+            t_spec = spec['jobTemplate']['spec']['template']['spec']
+        else:
+            t_spec = spec['template']['spec']
+    except (KeyError, TypeError):
+        return None
+    return t_spec if t_spec and isinstance(t_spec, dict) else None
+
+def _container_profile(c: dict, idx: int) -> dict:
+    """Picks the default-limits profile for a container from its image and command line."""
+    c_image = str(c.get('image', '')).lower()
+    cmd, args = c.get('command', []), c.get('args', [])
+    c_cmd = " ".join(cmd) if isinstance(cmd, list) else str(cmd)
+    c_args = " ".join(args) if isinstance(args, list) else str(args)
+    exec_context = (c_cmd + " " + c_args).lower()
+
+    if any(sig in exec_context for sig in _DUMMY_SIGNATURES): return _PROFILE_DUMMY
+    if any(sig in c_image for sig in _SIDECAR_SIGNATURES): return _PROFILE_SIDECAR
+    return _PROFILE_SECONDARY if idx > 0 else _PROFILE_PRIMARY
+
+def _looks_clean(doc_str: str) -> bool:
+    """Cheap pre-check for the defects the Regex Shield and pre-parser repair."""
+    if '\t' in doc_str or ': latest' in doc_str:
+        return False
+    return not (_RE_ODD_INDENT.search(doc_str) or _RE_KEY_NO_COLON.search(doc_str) or _RE_IMAGE_DEFECT.search(doc_str))
+
+def _split_docs(text: str) -> List[Tuple[Optional[str], str]]:
+    """Split a multi-document stream on '---' marker lines, keeping line endings.
+
+    Each document comes with the marker line that opened it (None for a first
+    document without one), so comments and tags on markers can be written back.
+    """
+    if "---" not in text:
+        return [(None, text)]  # Single document: one C-level substring scan, no line walk
+    docs, buf, marker = [], [], None
+    for line in text.splitlines(keepends=True):
+        # The startswith prefilter keeps rstrip() copies off ordinary lines
+        if line.startswith("---") and (line.rstrip() == "---" or line.startswith("--- ")):
+            docs.append((marker, "".join(buf)))
+            buf, marker = [], line.rstrip()
+        else:
+            buf.append(line)
+    docs.append((marker, "".join(buf)))
+    return docs
+
 class Healer:
     def __init__(self):
-        # Round-trip loader preserves comments and block styles
+        # Round-trip loader preserves comments and block styles (write-back path only)
         self.yaml = YAML(typ='rt')
         # Kubernetes Standard: 2 space mapping, 2 space sequence, 0 offset
         self.yaml.indent(mapping=2, sequence=4, offset=2)
@@ -27,8 +119,18 @@ class Healer:
         
         # --- SHIELD INTEGRATION ---
         self.shield = Shield()
+        self._depr_keys = self.shield.DEPRECATED_APIS
         self.detected_codes: Set[str] = set()
 
+        # Content-keyed memo: re-scans and 'fix after scan' skip parse/repair/emit entirely
+        self.heal_content = lru_cache(maxsize=256)(self._heal_content)
+        # On-disk counterpart for detect-only heal_file calls across runs (opened on first use)
+        self.result_cache = ResultCache()
+
+    def _fast_load(self, text: str):
+        """Read-only parse through libyaml; no comments, quotes or line metadata."""
+        return line_load(text)
+
     def parse_cpu(self, cpu_str: str) -> int:
         """Convert K8s CPU string to millicores."""
         if not cpu_str: return 0
@@ -46,7 +148,7 @@ class Healer:
         mem_str = str(mem_str).strip().lower()
         units = {'k': 1/1024, 'm': 1, 'g': 1024, 't': 1024*1024,
                  'ki': 1/1024, 'mi': 1, 'gi': 1024, 'ti': 1024*1024}
-        match = re.match(r'(\d+)([a-z]*)', mem_str)
+        match = _RE_MEM_QUANTITY.match(mem_str)
         if not match: return 0
         val, unit = match.groups()
         return int(int(val) * units.get(unit, 1))
@@ -68,27 +170,15 @@ class Healer:
         Lightweight Schema Validation: Checks if the mandatory top-level 
         fields for a given Kind are present.
         """
-        schema_requirements = {
-            'Pod': ['spec'],
-            'Deployment': ['spec'],
-            'Service': ['spec'],
-            'StatefulSet': ['spec'],
-            'DaemonSet': ['spec'],
-            'ConfigMap': ['data', 'binaryData'],
-            'Secret': ['data', 'stringData'],
-            'Ingress': ['spec'],
-            'Namespace': []
-        }
-        
-        if kind in schema_requirements:
-            fields = schema_requirements[kind]
+        if kind in _SCHEMA_REQUIREMENTS:
+            fields = _SCHEMA_REQUIREMENTS[kind]
             if not fields: return True
             return any(field in doc for field in fields)
         return True
 
-    def apply_security_patches(self, doc: dict, kind: str, global_line_offset: int = 0, apply_defaults: bool = False) -> None:
-        """Standard Security Hardening & Stability Patching."""
-        if not isinstance(doc, dict): return
+    def apply_security_patches(self, doc: dict, kind: str, global_line_offset: int = 0, apply_defaults: bool = False) -> bool:
+        """Standard Security Hardening & Stability Patching. Returns True if the doc was mutated."""
+        if not isinstance(doc, dict): return False
 
         # 1. Service Logic
         if kind == 'Service':
@@ -97,57 +187,30 @@ class Healer:
                 actual_line = global_line_offset + (self.get_line(doc, 'spec') - 1)
                 if not apply_defaults:
                     self.detected_codes.add(f"SVC_SELECTOR_MISSING:{actual_line}")
-            return
+            return False
         
         # 2. Workload Navigation
-        workloads = ['Deployment', 'Pod', 'StatefulSet', 'DaemonSet', 'Job', 'CronJob']
-        if kind not in workloads: return
+        if kind not in _WORKLOAD_KINDS: return False
             
-        spec = doc.get('spec', {})
-        if not isinstance(spec, dict): return
-
-        if kind == 'CronJob':
-            job_tmpl_spec = spec.get('jobTemplate', {}).get('spec', {})
-            template = job_tmpl_spec.get('template', {})
-            t_spec = template.get('spec', {})
-        elif kind == 'Pod':
-            t_spec = spec
-        else:
-            template = spec.get('template', {})
-            t_spec = template.get('spec', {})
-        
-        if not t_spec or not isinstance(t_spec, dict): return
+        t_spec = _pod_spec(doc, kind)
+        if t_spec is None: return False
 
-        # 3. Security: Token Audit
-        if t_spec.get('automountServiceAccountToken') is None:
-            token_line = global_line_offset + (self.get_line(t_spec) - 1)
-            self.detected_codes.add(f"SEC_TOKEN_AUDIT:{token_line}")
+        # 3. Security: the token audit is Shield's (SEC_TOKEN_AUDIT), reported from the Shield pass
 
         # 4. Container-level fixes
         containers = t_spec.get('containers', [])
-        if not isinstance(containers, list): return
+        if not isinstance(containers, list): return False
 
+        patched = False
         for idx, c in enumerate(containers):
-            c_image = str(c.get('image', '')).lower()
-            c_cmd = " ".join(c.get('command', [])) if isinstance(c.get('command'), list) else str(c.get('command', ''))
-            c_args = " ".join(c.get('args', [])) if isinstance(c.get('args'), list) else str(c.get('args', ''))
-            exec_context = (c_cmd + " " + c_args).lower()
-
-            is_dummy = any(sig in exec_context for sig in ['sleep ', 'tail -f /dev/null', 'pause', 'infinity'])
-            is_sidecar = any(sig in c_image for sig in ['istio-proxy', 'envoy', 'fluentd', 'sidecar', 'otel-collector'])
-            
-            if is_dummy: profile = {'cpu': '10m', 'memory': '32Mi'}
-            elif is_sidecar: profile = {'cpu': '100m', 'memory': '128Mi'}
-            elif idx > 0: profile = {'cpu': '200m', 'memory': '192Mi'}
-            else: profile = {'cpu': '500m', 'memory': '256Mi'}
-
-            # 5. Resources & OOM Fixes
-            res = c.get('resources', {})
+            # 5. Resources & OOM Fixes (the profile is only worked out when limits get injected)
+            res = c.get('resources') or {}  # `resources:` left empty parses as None
             if 'limits' not in res:
                 actual_line = global_line_offset + (self.get_line(c) - 1)
                 if apply_defaults:
-                    if 'resources' not in c: c['resources'] = {}
+                    if not c.get('resources'): c['resources'] = {}
                     reqs = res.get('requests', {})
+                    profile = _container_profile(c, idx)
                     final_cpu, final_mem = profile['cpu'], profile['memory']
                     if 'cpu' in reqs and self.parse_cpu(reqs['cpu']) > self.parse_cpu(final_cpu):
                         final_cpu = reqs['cpu']
@@ -155,6 +218,7 @@ class Healer:
                         final_mem = reqs['memory']
                     c['resources']['limits'] = {'cpu': final_cpu, 'memory': final_mem}
                     self.detected_codes.add(f"OOM_FIXED:{actual_line}")
+                    patched = True
                 else:
                     self.detected_codes.add(f"OOM_RISK:{actual_line}")
 
@@ -165,169 +229,38 @@ class Healer:
                 if apply_defaults:
                     s_ctx['privileged'] = False
                     self.detected_codes.add(f"SEC_PRIVILEGED_FIXED:{actual_line}")
+                    patched = True
                 else:
                     self.detected_codes.add(f"SEC_PRIVILEGED_RISK:{actual_line}")
 
-    def heal_file(self, file_path: str, apply_fixes: bool = True, apply_defaults: bool = False, dry_run: bool = False, return_content: bool = False) -> Tuple[Union[bool, Optional[str]], Set[str]]:
-        try:
-            if not os.path.exists(file_path): return (None if return_content else False, set())
-            with open(file_path, 'r') as f: original_content = f.read()
-            
-            raw_docs = re.split(r'^---\s*$', original_content, flags=re.MULTILINE)
-            healed_parts = []
-            self.detected_codes = set()           
-
-            # --- PASS 1: METADATA MAP (Multi-Pass Mapping) ---
-            all_parsed_docs = []
-            label_map = {}
-            for doc_str in raw_docs:
-                if not doc_str.strip(): continue
-                clean_d, _ = RegexShield.sanitize(doc_str)
-                try:
-                    temp_parsed = self.yaml.load(clean_d)
-                    if temp_parsed and isinstance(temp_parsed, dict):
-                        all_parsed_docs.append(temp_parsed)
-                        kind, name = temp_parsed.get('kind'), temp_parsed.get('metadata', {}).get('name')
-                        if kind and name:
-                            labels = None
-                            if kind == 'Pod':
-                                labels = temp_parsed.get('metadata', {}).get('labels')
-                            elif kind in ['Deployment', 'StatefulSet', 'DaemonSet']:
-                                labels = temp_parsed.get('spec', {}).get('template', {}).get('metadata', {}).get('labels')
-                            if labels: label_map[(kind, name)] = labels
-                except Exception: continue
-
-            # --- PASS 2: HEALING LOOP ---
-            current_line_offset = 1
-            for doc_str in raw_docs:
-                if not doc_str.strip():
-                    current_line_offset += len(doc_str.splitlines()) + 1
-                    continue
-
-                # 1. INITIAL REGEX SANITIZATION (Regex Shield)
-                d, shield_codes = RegexShield.sanitize(doc_str)
-                lines_in_doc = len(doc_str.splitlines())
-                for code in shield_codes:
-                    self.detected_codes.add(f"{code}:{current_line_offset}")
-
-                # 2. ENHANCED PRE-PARSER (Indentation, Metadata, Colons)
-                lines = d.splitlines()
-                repaired_lines = []
-                last_valid_indent = 0 # Track parent depth
-                
-                for idx, line in enumerate(lines):
-                    clean_line = line.rstrip()
-                    if not clean_line.strip():
-                        repaired_lines.append("")
-                        continue
-                
-                    stripped = clean_line.lstrip()
-                    indent = len(clean_line) - len(stripped)
-                    is_parent = stripped.endswith(':')
-                
-                    # A. RELATIVE INDENTATION SNAP
-                    if indent > 0:
-                        # If the jump is more than 2 or is an odd number of spaces
-                        if (indent - last_valid_indent) > 2 or (indent % 2 != 0):
-                            new_indent = last_valid_indent + 2
-                            clean_line = (" " * new_indent) + stripped
-                            indent = new_indent
-                            self.detected_codes.add(f"FIX_INDENTATION_SNAPPED:{current_line_offset + idx}")
-                
-                    # B. Metadata Alignment (Special case for 'name' in metadata)
-                    if "name:" in clean_line and clean_line.startswith("    "):
-                         # Keep this as a safety fallback for common K8s metadata bloat
-                         is_in_metadata = any("metadata:" in line for line in repaired_lines[-5:])
-                         if "name:" in clean_line and clean_line.startswith("    ") and is_in_metadata:
-                            clean_line = "  " + clean_line.lstrip()
-                            indent = 2
-                
-                    # C. Smart Colon Injection
-                    k8s_keys = r"(image|name|containerPort|hostPort|protocol|imagePullPolicy|kind|apiVersion|labels)"
-                    if re.search(rf'^[ \t]*{k8s_keys}[ \t]+[\'"\[\w]', clean_line) and ":" not in clean_line:
-                        clean_line = re.sub(rf'^([ \t]*)({k8s_keys})([ \t]+)', r'\1\2: \3', clean_line)
-                        self.detected_codes.add(f"FIX_COLON_INJECTED:{current_line_offset + idx}")
-                        
-                    # D. Double-colon guard
-                    if "image: image" in clean_line:
-                        clean_line = clean_line.replace("image: image", "image: ")
-                
-                    # Update tracker for next line
-                    if is_parent:
-                        last_valid_indent = indent
-                    elif stripped.startswith("- "):
-                        last_valid_indent = indent + 2 
-                
-                    repaired_lines.append(clean_line)
-                
-                d = "\n".join(repaired_lines)
-
-                # 3. PARSING & STRUCTURAL HEALING
-                try:
-                    parsed = self.yaml.load(d)
-                    if parsed and isinstance(parsed, dict):
-                        kind = parsed.get('kind')
-                        api = parsed.get('apiVersion')
-                        name = parsed.get('metadata', {}).get('name')
-
-                        if not self.validate_schema(parsed, kind):
-                            self.detected_codes.add(f"SCHEMA_INVALID_STRUCTURE:{current_line_offset}")
-
-                        findings = self.shield.scan(parsed, all_docs=all_parsed_docs)
-                        for f in findings:
-                            abs_line = (current_line_offset + f['line'] - 1) if f['line'] > 0 else current_line_offset
-                            self.detected_codes.add(f"{f['code']}:{abs_line}")
-
-                        # API & Selector Fixes
-                        if api in self.shield.DEPRECATIONS:
-                            if apply_fixes:
-                                mapping = self.shield.DEPRECATIONS[api]
-                                new_api = mapping.get(kind, mapping.get("default")) if isinstance(mapping, dict) else mapping
-                                if new_api and not str(new_api).startswith("REMOVED"):
-                                    parsed['apiVersion'] = new_api
-                                    if new_api == 'apps/v1' and kind == 'Deployment' and 'selector' not in parsed.get('spec', {}):
-                                        labels = parsed.get('spec', {}).get('template', {}).get('metadata', {}).get('labels')
-                                        if labels: 
-                                            parsed['spec']['selector'] = {'matchLabels': labels}
-                                            self.detected_codes.add(f"FIX_SELECTOR_INJECTED:{current_line_offset}")
-
-                        # Service Healing
-                        if kind == 'Service' and apply_fixes and not parsed.get('spec', {}).get('selector'):
-                            matching_labels = None
-                            for target_kind in ['Deployment', 'StatefulSet', 'DaemonSet', 'Pod']:
-                                if (target_kind, name) in label_map:
-                                    matching_labels = label_map[(target_kind, name)]
-                                    break
-                            if matching_labels:
-                                parsed['spec']['selector'] = matching_labels
-                                self.detected_codes.add(f"SVC_SELECTOR_FIXED:{current_line_offset}")
-
-                        self.apply_security_patches(parsed, kind, current_line_offset, apply_defaults)
-                        
-                        buf = StringIO()
-                        self.yaml.dump(parsed, buf)
-                        healed_parts.append(buf.getvalue().rstrip())
-                    else:
-                        healed_parts.append(d.strip())
+        return patched
 
-                except Exception as e:
-                    mark = getattr(e, 'problem_mark', None)                    
-                    error_line = current_line_offset + (mark.line if mark else 0)
-                    self.detected_codes.add(f"SYNTAX_ERROR:{error_line}")
-                    healed_parts.append(d.strip())             
+    def _read(self, file_path: str) -> str:
+        return read_manifest(file_path)
 
-                current_line_offset += lines_in_doc + 1
+    def heal_file(self, file_path: str, apply_fixes: bool = True, apply_defaults: bool = False, dry_run: bool = False, return_content: bool = False) -> Tuple[Union[bool, Optional[str]], Set[str]]:
+        try:
+            # Detect-only runs never write the healed text, so they skip the round-trip emitter
+            # and can be answered from the result cache while the file is unchanged
+            detect_only = dry_run and not return_content
+            try:
+                if detect_only:
+                    st = os.stat(file_path)  # Before the read: a racing edit can only make the key stale
+                    cache_key = self.result_cache.key(file_path, st, (apply_fixes, apply_defaults))
+                    cached = self.result_cache.get(cache_key)
+                    if cached is not None:
+                        self.detected_codes = cached[1]
+                        return cached
+                original_content = self._read(file_path)
+            except FileNotFoundError:
+                return (None if return_content else False, set())
+            healed_final, codes = self.heal_content(original_content, apply_fixes, apply_defaults, not detect_only)
+            self.detected_codes = set(codes)
 
-            # --- 4. GHOST DOCUMENT FILTERING & STABILITY ---
-            healed_parts = [p for p in healed_parts if p.strip()]
-            healed_final = ("---\n" if original_content.startswith("---") else "") + "\n---\n".join(healed_parts) + "\n"
-            
-            # Clean trailing whitespace on every line to ensure stability
-            healed_final = "\n".join([l.rstrip() for l in healed_final.splitlines()]) + "\n"
-            
             if return_content: return (healed_final, self.detected_codes)
             
-            changed = original_content.strip() != healed_final.strip()
+            # None means a document was mutated (text not emitted). Identical text short-circuits the stripped compare
+            changed = healed_final is None or (healed_final != original_content and original_content.strip() != healed_final.strip())
             if changed and not dry_run:
                 with open(file_path, 'w') as f: f.write(healed_final)
             # NEW: If we are in dry_run, but the file is ALREADY clean, 
@@ -335,14 +268,283 @@ class Healer:
             if dry_run and not changed:
                 # Remove all FIX codes because the file on disk matches our healed version
                 self.detected_codes = {c for c in self.detected_codes if "FIX_" not in c}
+            if detect_only:
+                self.result_cache.put(cache_key, changed, self.detected_codes, st)
                 
             return (changed, self.detected_codes)
 
         except Exception:
             return (None if return_content else False, set())
 
+    def _repair_document(self, doc_str: str, line_offset: int) -> str:
+        """Text-level repair pipeline (Regex Shield + pre-parser) for a single document."""
+        # 1. INITIAL REGEX SANITIZATION (Regex Shield)
+        d, shield_codes = RegexShield.sanitize(doc_str)
+        for code in shield_codes:
+            self.detected_codes.add(f"{code}:{line_offset}")
+
+        # 2. ENHANCED PRE-PARSER: one pass over the lines, cheap string checks before any regex
+        repaired_lines = []
+        last_valid_indent = 0 # Track parent depth
+        last_metadata_idx = -6 # Output index of the latest 'metadata:' line
+        open_blocks = [] # (source column, output column, child column) of the enclosing lines
+        has_tabs = '\t' in d # One C-level scan: tab-free documents never slice out an indent to look for tabs
+
+        for idx, line in enumerate(d.splitlines()):
+            clean_line = line.rstrip()
+            stripped = clean_line.lstrip()
+            if not stripped:
+                repaired_lines.append("")
+                continue
+            # Comments carry no structure: keep them verbatim and out of the indent tracker
+            if stripped[0] == '#':
+                repaired_lines.append(clean_line)
+                continue
+
+            indent = raw_indent = len(clean_line) - len(stripped)
+            is_parent = stripped.endswith(':')
+            is_item = stripped.startswith('- ')
+            tab_placed = False
+            if has_tabs and '\t' in clean_line[:indent]:
+                # YAML forbids tab indentation: seat the line in the open block its tab-stop column points at
+                raw_indent = len(clean_line[:indent].expandtabs(4))
+                while open_blocks and open_blocks[-1][0] > raw_indent:
+                    open_blocks.pop()
+                if open_blocks and open_blocks[-1][0] == raw_indent:
+                    tab_placed = open_blocks[-1][1]  # Sibling of an open line
+                elif open_blocks and open_blocks[-1][2] is not None:
+                    tab_placed = open_blocks[-1][2]  # First child of a 'key:' or '- ' line
+                # Otherwise the nesting is ambiguous: the tab stays and the parser reports it
+                if tab_placed is not False:
+                    clean_line = (" " * tab_placed) + stripped
+                    indent = tab_placed
+                    self.detected_codes.add(f"FIX_TABS_EXPANDED:{line_offset + idx}")
+
+            # A. RELATIVE INDENTATION SNAP
+            if indent > 0 and tab_placed is False:
+                # If the jump is more than 2 or is an odd number of spaces
+                if (indent - last_valid_indent) > 2 or (indent % 2 != 0):
+                    new_indent = last_valid_indent + 2
+                    clean_line = (" " * new_indent) + stripped
+                    indent = new_indent
+                    self.detected_codes.add(f"FIX_INDENTATION_SNAPPED:{line_offset + idx}")
+
+            # B. Metadata Alignment (Special case for 'name' in metadata)
+            # Keep this as a safety fallback for common K8s metadata bloat
+            if "name:" in clean_line and clean_line.startswith("    ") and len(repaired_lines) - last_metadata_idx <= 5:
+                clean_line = "  " + stripped
+                indent = 2
+
+            # C. Smart Colon Injection
+            if ":" not in clean_line and _RE_MISSING_COLON.match(clean_line):
+                clean_line = _RE_COLON_INJECT.sub(r'\1\2: ', clean_line, count=1)
+                self.detected_codes.add(f"FIX_COLON_INJECTED:{line_offset + idx}")
+
+            # Update tracker for next line
+            if is_parent:
+                last_valid_indent = indent
+            elif stripped.startswith("- "):
+                last_valid_indent = indent + 2 
+
+            if "metadata:" in clean_line:
+                last_metadata_idx = len(repaired_lines)
+            while open_blocks and open_blocks[-1][0] >= raw_indent:
+                open_blocks.pop()
+            child = indent + (4 if is_item and is_parent else 2) if is_item or is_parent else None
+            open_blocks.append((raw_indent, indent, child))
+            repaired_lines.append(clean_line)
+
+        return "\n".join(repaired_lines)
+
+    def _dump_batch(self, batch: list) -> Tuple[Optional[str], str]:
+        """Round-trip dump of consecutive mutated docs, tagged with the first one's marker line."""
+        buf = StringIO()
+        self.yaml.dump_all([doc for _, doc in batch], buf)
+        return batch[0][0], buf.getvalue().rstrip()
+
+    def _fix_document(self, parsed: dict, line_offset: int, apply_fixes: bool, apply_defaults: bool, label_map: dict) -> bool:
+        """API migration, selector healing and security patches for one document. Returns True if it was mutated."""
+        kind = parsed.get('kind')
+        # Plain str: hashes natively (not via ruamel ScalarString) and never raises on odd values
+        api = str(parsed.get('apiVersion'))
+        name = parsed.get('metadata', {}).get('name')
+        mutated = False
+
+        # API & Selector Fixes
+        if api in self._depr_keys:
+            if apply_fixes:
+                new_api = self.shield.upgrade_for(api, kind)
+                if new_api and not str(new_api).startswith("REMOVED"):
+                    parsed['apiVersion'] = new_api
+                    mutated = True
+                    if new_api == 'apps/v1' and kind == 'Deployment' and 'selector' not in parsed.get('spec', {}):
+                        labels = parsed.get('spec', {}).get('template', {}).get('metadata', {}).get('labels')
+                        if labels: 
+                            parsed['spec']['selector'] = {'matchLabels': labels}
+                            self.detected_codes.add(f"FIX_SELECTOR_INJECTED:{line_offset + self.get_line(parsed, 'spec') - 1}")
+
+        # Service Healing
+        if kind == 'Service' and apply_fixes and not parsed.get('spec', {}).get('selector'):
+            matching_labels = None
+            for target_kind in _SELECTOR_TARGETS:
+                if (target_kind, name) in label_map:
+                    matching_labels = label_map[(target_kind, name)]
+                    break
+            if matching_labels:
+                parsed['spec']['selector'] = dict(matching_labels)
+                mutated = True
+                self.detected_codes.add(f"SVC_SELECTOR_FIXED:{line_offset + self.get_line(parsed, 'spec') - 1}")
+
+        if self.apply_security_patches(parsed, kind, line_offset, apply_defaults):
+            mutated = True
+        return mutated
+
+    def _trial_fix(self, d: str, line_offset: int, apply_fixes: bool, apply_defaults: bool, label_map: dict) -> Tuple[bool, Set[str]]:
+        """Runs _fix_document on a private libyaml parse of `d`. Returns (mutated, codes) without recording the codes."""
+        held, self.detected_codes = self.detected_codes, set()
+        try:
+            return self._fix_document(self._fast_load(d), line_offset, apply_fixes, apply_defaults, label_map), self.detected_codes
+        finally:
+            self.detected_codes = held
+
+    def _heal_content(self, original_content: str, apply_fixes: bool = True, apply_defaults: bool = False, emit: bool = True) -> Tuple[Optional[str], FrozenSet[str]]:
+        """Runs the full repair pipeline on raw manifest text. Returns (healed_text, codes).
+
+        With emit=False the healed text is None whenever a document was mutated,
+        so detection-only callers never pay for the round-trip dump.
+        """
+        leading_marker = original_content.startswith("---")
+        raw_docs = _split_docs(original_content)
+        healed_parts = []
+        part_markers = []  # Marker line of each prepared doc, aligned with healed_parts
+        self.detected_codes = set()           
+
+        # --- PASS 1: TEXT REPAIR & METADATA MAP (each doc is repaired and fast-parsed once) ---
+        all_parsed_docs = []
+        label_map = {}
+        prepared = []  # (text_to_parse, line_offset, fast_doc)
+        current_line_offset = 1
+        for marker, doc_str in raw_docs:
+            lines_in_doc = len(doc_str.splitlines())
+            if not doc_str.strip():
+                current_line_offset += lines_in_doc + 1
+                continue
+
+            # FAST PATH: docs without known defects skip the repair pipeline if they parse as-is
+            d, temp_parsed = doc_str, _UNPARSED
+            if _looks_clean(doc_str):
+                try:
+                    temp_parsed = self._fast_load(doc_str)
+                except Exception:
+                    temp_parsed = _UNPARSED
+            if temp_parsed is _UNPARSED:
+                d = self._repair_document(doc_str, current_line_offset)
+                try:
+                    temp_parsed = self._fast_load(d)
+                except Exception:
+                    temp_parsed = None
+            prepared.append((d, current_line_offset, temp_parsed))
+            part_markers.append(marker)
+            current_line_offset += lines_in_doc + 1
+
+            if temp_parsed and isinstance(temp_parsed, dict):
+                all_parsed_docs.append(temp_parsed)
+                try:
+                    kind, name = temp_parsed.get('kind'), temp_parsed.get('metadata', {}).get('name')
+                    if kind and name:
+                        labels = None
+                        if kind == 'Pod':
+                            labels = temp_parsed.get('metadata', {}).get('labels')
+                        elif kind in _TEMPLATE_KINDS:
+                            labels = temp_parsed.get('spec', {}).get('template', {}).get('metadata', {}).get('labels')
+                        if labels: label_map[(kind, name)] = labels
+                except (AttributeError, TypeError):
+                    pass  # Malformed metadata/spec (scalar or unhashable name): the doc just feeds no labels
+
+        # --- PASS 2: HEALING LOOP ---
+        # Detection runs on the libyaml docs from pass 1 (they carry ruamel-style line data).
+        # Only documents that actually get mutated are re-parsed with the round-trip loader.
+        for d, current_line_offset, parsed in prepared:
+            try:
+                if parsed is None:
+                    # libyaml rejected it: let the round-trip loader report the syntax error
+                    parsed = self.yaml.load(d)
+                if parsed and isinstance(parsed, dict):
+                    if not self.validate_schema(parsed, parsed.get('kind')):
+                        self.detected_codes.add(f"SCHEMA_INVALID_STRUCTURE:{current_line_offset}")
+
+                    findings = self.shield.scan(parsed, all_docs=all_parsed_docs)
+                    for f in findings:
+                        abs_line = (current_line_offset + f['line'] - 1) if f['line'] > 0 else current_line_offset
+                        self.detected_codes.add(f"{f['code']}:{abs_line}")
+
+                    if hasattr(parsed, 'ca') or not (apply_fixes or apply_defaults):
+                        # Round-trip fallback docs are private, and detection-only runs never mutate
+                        mutated = self._fix_document(parsed, current_line_offset, apply_fixes, apply_defaults, label_map)
+                    else:
+                        # The pass-1 doc is the Shield context for later documents: trial the fixes on a copy
+                        mutated, trial_codes = self._trial_fix(d, current_line_offset, apply_fixes, apply_defaults, label_map)
+                        if mutated and emit:
+                            # The round-trip pass decides what gets written and which codes are reported
+                            parsed = self.yaml.load(d)
+                            mutated = self._fix_document(parsed, current_line_offset, apply_fixes, apply_defaults, label_map)
+                        else:
+                            self.detected_codes |= trial_codes
+
+                    # Untouched docs are emitted as-is; mutated ones are queued for the round-trip dumper
+                    if mutated:
+                        healed_parts.append(parsed)
+                    else:
+                        healed_parts.append(d.strip())
+                else:
+                    healed_parts.append(d.strip())
+
+            except (YAMLError, ValueError) as e:
+                # Unparseable text or an unconstructible scalar (bad timestamp, base64, ...)
+                mark = getattr(e, 'problem_mark', None)                    
+                error_line = current_line_offset + (mark.line if mark else 0)
+                self.detected_codes.add(f"SYNTAX_ERROR:{error_line}")
+                healed_parts.append(d.strip())             
+            except Exception:
+                # Valid YAML that tripped a checker or patcher: keep the doc as-is, but don't disguise it as a syntax error
+                logger.debug("Healing skipped for document at line %d", current_line_offset, exc_info=True)
+                self.detected_codes.add(f"HEAL_SKIPPED:{current_line_offset}")
+                healed_parts.append(d.strip())
+
+        # --- 4. EMISSION: consecutive mutated docs share one dump_all stream ---
+        if not emit and any(not isinstance(p, str) for p in healed_parts):
+            return (None, frozenset(self.detected_codes))
+        emitted = []  # (marker line, text) per output chunk
+        batch = []    # Consecutive mutated docs: one dump_all stream, which separates them with a bare '---'
+        for marker, part in zip(part_markers, healed_parts):
+            if batch and (isinstance(part, str) or marker not in (None, "---")):
+                emitted.append(self._dump_batch(batch))  # A commented or tagged marker opens a new stream
+                batch = []
+            if not isinstance(part, str):
+                batch.append((marker, part))
+            elif part.strip():  # Ghost document filtering
+                emitted.append((marker, part))
+        if batch:
+            emitted.append(self._dump_batch(batch))
+        # Marker lines are written back verbatim; the first chunk only gets one if the stream opened with it
+        healed_final = "\n".join(
+            text if (i == 0 and not leading_marker) or marker is None else f"{marker}\n{text}"
+            for i, (marker, text) in enumerate(emitted)
+        ) + "\n"
+
+        # Clean trailing whitespace on every line to ensure stability (skipped when already clean)
+        if _RE_UNSTABLE_EOL.search(healed_final):
+            healed_final = "\n".join([l.rstrip() for l in healed_final.splitlines()]) + "\n"
+
+        return (healed_final, frozenset(self.detected_codes))
+
+_HEALER: Optional[Healer] = None  # Shared by linter_engine calls: YAML/Shield setup and the content memo are built once
+
 def linter_engine(file_path: str, apply_api_fixes: bool = True, apply_defaults: bool = False, dry_run: bool = False, return_content: bool = False) -> Tuple[Union[bool, Optional[str]], Set[str]]:
-    return Healer().heal_file(file_path, apply_api_fixes, apply_defaults, dry_run, return_content)
+    global _HEALER
+    if _HEALER is None:
+        _HEALER = Healer()
+    return _HEALER.heal_file(file_path, apply_api_fixes, apply_defaults, dry_run, return_content)
 
 if __name__ == "__main__":
     if len(sys.argv) < 2: 
@@ -352,12 +554,11 @@ if __name__ == "__main__":
     file_to_scan = sys.argv[1]
     res, codes = linter_engine(file_to_scan, dry_run=True)
 
-    print(f"\n{'='*60}")
-    print(f"🛡️  KUBE-SHIELD AUDIT REPORT: {file_to_scan}")
-    print(f"{'='*60}")
+    # Build the whole report first and emit it with a single write
+    report = [f"\n{'='*60}", f"🛡️  KUBE-SHIELD AUDIT REPORT: {file_to_scan}", f"{'='*60}"]
 
     if not codes:
-        print("✅ No stability or security issues detected.")
+        report.append("✅ No stability or security issues detected.")
     else:
         sorted_findings = sorted(list(codes), key=lambda x: int(x.split(':')[-1]) if ':' in x else 0)
         for finding in sorted_findings:
@@ -367,10 +568,11 @@ if __name__ == "__main__":
             if any(x in code for x in ["CRITICAL", "OOM", "PRIVILEGED", "SYNTAX", "ERROR"]): pref = "🔴"
             elif any(x in code for x in ["HIGH", "WILD", "REMOVED"]): pref = "🟠"
             elif "FIX" in code: pref = "🔧"            
-            print(f"Line {line.ljust(4)} | {pref} {code}")
-        print("-" * 60)
+            report.append(f"Line {line.ljust(4)} | {pref} {code}")
+        report.append("-" * 60)
         if res:
-            print(f"💾 STATS: Changes applied to {file_to_scan}")
+            report.append(f"💾 STATS: Changes applied to {file_to_scan}")
         else:
-            print(f"🔍 STATS: {len(codes)} issues found. No changes saved (Dry Run).")
-    print(f"{'='*60}\n")
+            report.append(f"🔍 STATS: {len(codes)} issues found. No changes saved (Dry Run).")
+    report.append(f"{'='*60}\n")
+    sys.stdout.write("\n".join(report) + "\n")
@@ -5,50 +5,40 @@ KubeCuro v1.0.0 - Kubernetes Logic Diagnostics & Auto-Healer ✨
 ═══════════════════════════════════════════════════════════════
 CNCF-Grade CLI 
 """
-# Core Engine 
-from kubecuro.healer import linter_engine
-from kubecuro.synapse import Synapse
-from kubecuro.shield import Shield
+# Core Engine (Healer/Synapse/Shield and their YAML stacks are imported on first use)
 from kubecuro.models import AuditIssue
 
-import sys, os, logging, argparse, platform, time, json, re, difflib, argcomplete, random, contextlib, subprocess, yaml
-import ruamel.yaml
-import rich.box as box
+import sys, os, argparse, time, json, contextlib
+from collections import Counter
+from types import MappingProxyType
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Tuple, Union
 from dataclasses import dataclass
 from contextlib import contextmanager
-from io import StringIO
-
-from rich.console import Console
-from rich.table import Table
-from rich.panel import Panel
-from rich.live import Live
-from rich.logging import RichHandler
-from rich.markdown import Markdown
-from rich.syntax import Syntax
-from rich.rule import Rule
-from rich.layout import Layout
-from rich.text import Text
-from rich.align import Align
-from rich.columns import Columns
-from rich.console import Group
-from rich.theme import Theme
-from rich.traceback import install
-from rich.progress import (Progress, SpinnerColumn, TextColumn, BarColumn, MofNCompleteColumn, 
-                          TaskProgressColumn, ProgressBar, TimeElapsedColumn)
-
-from rich.padding import Padding
-from argcomplete.completers import FilesCompleter
-
-custom_theme = Theme({
-    "info": "dim cyan",
-    "warning": "magenta",
-    "danger": "bold red",
-    "success": "bold green",
-    "fix": "bold blue"
-})
-console = Console(theme=custom_theme)
+
+# Rich, argcomplete and the process pool are imported where they are used, so
+# `--help`, usage errors and tab completion never pay for them at startup.
+class _LazyConsole:
+    """Single shared console, built (and Rich imported) on first use."""
+    _console = None
+
+    def _get(self):
+        if _LazyConsole._console is None:
+            from rich.console import Console
+            _LazyConsole._console = Console(force_terminal=True, width=120, color_system="256")
+        return _LazyConsole._console
+
+    def __getattr__(self, name):
+        return getattr(self._get(), name)
+
+    # `with console:` buffers every print until exit (dunders bypass __getattr__)
+    def __enter__(self):
+        return self._get().__enter__()
+
+    def __exit__(self, *exc):
+        return self._get().__exit__(*exc)
+
+console = _LazyConsole()
 
 # ========== KUBECURO FREEMIUM GATE ==========
 PRO_RULES = {
@@ -62,11 +52,28 @@ def is_pro_user():
     license_key = os.getenv("KUBECURO_PRO")
     return license_key in ["1", "unlocked", "pro"]
 # ===========================================
+
+# Human-readable messages for healer codes in the audit report
+HEALER_MESSAGES = {
+    "OOM_RISK": "Container missing resource limits (Risk of OOMKill)",
+    "LIVENESS_MISSING": "No Liveness Probe defined for container",
+    "READINESS_MISSING": "No Readiness Probe defined for container",
+    "HEAL_SKIPPED": "Document has an unexpected structure; it was not analysed or healed"
+}
         
-# S-Tier Setup
-install(console=Console(file=sys.stderr), show_locals=True, width=120)
-logging.basicConfig(level="INFO", handlers=[RichHandler()], format="%(message)s")
-console = Console(force_terminal=True, width=120, color_system="256")
+# S-Tier Setup (deferred: only commands that run the engines pay for it)
+ENGINE_COMMANDS = {"scan", "fix", "baseline"}
+# Report-only commands: their output is rendered into one buffered write
+BUFFERED_COMMANDS = {"completion", "checklist", "explain"}
+
+def _configure_runtime():
+    """Installs Rich tracebacks and logging once we know real work is about to run."""
+    import logging
+    from rich.console import Console
+    from rich.logging import RichHandler
+    from rich.traceback import install
+    install(console=Console(file=sys.stderr), show_locals=True, width=120)
+    logging.basicConfig(level="INFO", handlers=[RichHandler()], format="%(message)s")
 
 # ═══════════════════════════════════════════════════════════════
 # CONSTANTS & CONFIG
@@ -189,6 +196,66 @@ class Config:
         }
 
 CONFIG = Config()
+YAML_SUFFIXES = ('.yaml', '.yml')  # Tuple: str.endswith takes it directly, `in` works for Path.suffix
+
+_RULE_INDEX = None
+_CHECKLIST_ROWS = None
+
+def _rule_index() -> Tuple[Dict[str, str], Dict[str, tuple]]:
+    """Explain lookups, derived from RULES_REGISTRY once: (UPPER category -> name, UPPER rule ID -> (category, data))."""
+    global _RULE_INDEX
+    if _RULE_INDEX is None:
+        categories = {cat.upper(): cat for cat in CONFIG.RULES_REGISTRY}
+        all_rules = {rid.upper(): (cat_name, data)
+                     for cat_name, rules in CONFIG.RULES_REGISTRY.items()
+                     for rid, data in rules.items()}
+        # Read-only views: the index is shared by every caller for the life of the process
+        _RULE_INDEX = (MappingProxyType(categories), MappingProxyType(all_rules))
+    return _RULE_INDEX
+
+def _checklist_rows() -> Tuple[Tuple[str, str, str, str], ...]:
+    """Checklist table rows (ID, category, title, severity markup), sorted by rule ID and built once."""
+    global _CHECKLIST_ROWS
+    if _CHECKLIST_ROWS is None:
+        rows = []
+        for category, rules in CONFIG.RULES_REGISTRY.items():
+            for rid, data in rules.items():
+                sev = data.get("severity", "Medium").upper()
+                sev_color = "red" if "HIGH" in sev else "yellow" if "MED" in sev else "blue"
+                rows.append((rid, category, data.get("title", "N/A"), f"[{sev_color}]{sev}[/{sev_color}]"))
+        # Sort rules by ID for deterministic UI
+        rows.sort(key=lambda r: r[0])
+        _CHECKLIST_ROWS = tuple(rows)
+    return _CHECKLIST_ROWS
+
+_SEVERITY_RANKS: Dict[str, str] = {}
+_SEVERITY_COLORS = {"critical": "bright_red", "high": "orange3", "medium": "yellow"}
+
+def _severity_rank(severity: str) -> str:
+    """'critical', 'high', 'medium', 'low' or '' for a severity label; the few distinct labels are parsed once each."""
+    rank = _SEVERITY_RANKS.get(severity)
+    if rank is None:
+        sev = severity.upper()
+        if 'CRITICAL' in sev:
+            rank = "critical"
+        elif 'HIGH' in sev:
+            rank = "high"
+        elif 'MEDIUM' in sev:
+            rank = "medium"
+        elif 'LOW' in sev or 'INFO' in sev:
+            rank = "low"
+        else:
+            rank = ""
+        _SEVERITY_RANKS[severity] = rank
+    return rank
+
+def _yaml_error_summary(err: Exception) -> str:
+    """What went wrong in a YAML error (libyaml's 'problem' plus its 'context'), without the position dump."""
+    problem = getattr(err, 'problem', None)
+    if not problem:
+        return str(err).strip()  # Not a marked YAML error (unreadable file, bad scalar value)
+    context = getattr(err, 'context', None)
+    return f"{problem} ({context})" if context else problem
 
 # ═══════════════════════════════════════════════════════════════
 # S-TIER CLI DISPATCHER
@@ -224,11 +291,14 @@ class KubecuroCLI:
         
         handler = handlers.get(args.command)
         if handler:
-            # Check if handler accepts args (checklist doesn't strictly need them but dispatcher sends them)
-            try:
-                handler(args)
-            except TypeError:
-                handler()
+            # Baseline streams its scan progress, so only report-only commands are buffered
+            buffered = self.console if args.command in BUFFERED_COMMANDS else contextlib.nullcontext()
+            with buffered:
+                # Check if handler accepts args (checklist doesn't strictly need them but dispatcher sends them)
+                try:
+                    handler(args)
+                except TypeError:
+                    handler()
             return
         
         # Core commands: scan/fix
@@ -290,12 +360,14 @@ class KubecuroCLI:
     
     def _show_version(self, args):
         """Show version information."""
+        import platform
         self.console.print(f"[bold magenta]KubeCuro {CONFIG.VERSION}[/] • [dim]{platform.machine()}[/]")
     
     def _handle_completion(self, args):
         """Handle shell completion setup."""
         shell = getattr(args, 'shell', 'bash') or 'bash'
         rc_file = "~/.bashrc" if shell == "bash" else "~/.zshrc"
+        from rich.panel import Panel
         self.console.print(Panel.fit(
             f"[bold cyan]🚀 TAB COMPLETION SETUP[/]\n\n"
             f"[green]•[/] Test: [code]source <(register-python-argcomplete kubecuro)[/]\n"
@@ -304,6 +376,9 @@ class KubecuroCLI:
         
     def _show_checklist(self, args=None):
         """Show a production-grade categorized rule showcase with accurate counts."""
+        import rich.box as box
+        from rich.table import Table
+
         table = Table(
             title="📋 KubeCuro Logic Arsenal",
             box=box.MINIMAL_DOUBLE_HEAD,
@@ -317,33 +392,14 @@ class KubecuroCLI:
         table.add_column("Logic Description", justify="left")
         table.add_column("Severity", justify="center")
 
-        # 1. Flatten and Count from the Dictionary Registry
-        all_rules = []
-        for category, rules in CONFIG.RULES_REGISTRY.items():
-            for rid, data in rules.items():
-                all_rules.append({
-                    "id": rid,
-                    "category": category,
-                    "title": data.get("title", "N/A"),
-                    "severity": data.get("severity", "Medium")
-                })
-
-        # 2. Sort rules by ID for deterministic UI
-        all_rules.sort(key=lambda x: x["id"])
-
-        # 3. Populate Table
-        for rule in all_rules:
-            sev = rule["severity"].upper()
-            sev_color = "red" if "HIGH" in sev else "yellow" if "MED" in sev else "blue"
-            
-            table.add_row(
-                rule["id"],
-                rule["category"],
-                rule["title"],
-                f"[{sev_color}]{sev}[/{sev_color}]"
-            )
+        # 1. Flattened, sorted rows from the Dictionary Registry
+        all_rules = _checklist_rows()
+
+        # 2. Populate Table
+        for row in all_rules:
+            table.add_row(*row)
 
-        # 4. Final Display
+        # 3. Final Display
         self.console.print(table)
         self.console.print(f"\n[bold cyan]✔ Total Logic Rules Loaded: {len(all_rules)}[/bold cyan]")
         self.console.print(f"[dim]Use 'kubecuro explain <ID>' for deep-dive analysis logic.[/dim]\n")
@@ -356,15 +412,10 @@ class KubecuroCLI:
         resource_val = getattr(args, 'resource', None)
         search_term = (resource_val.strip().upper() if resource_val else "")
 
-        # 1. Map out the Registry
+        # 1. Map out the Registry (built once per process)
         # categories: {'NETWORKING': 'NETWORKING', 'SECURITY': 'SECURITY', ...}
-        categories = {cat.upper(): cat for cat in CONFIG.RULES_REGISTRY.keys()}
-        
         # all_rules: {'SVC_PORT_MISS': ('NETWORKING', {...}), ...}
-        all_rules = {} 
-        for cat_name, rules in CONFIG.RULES_REGISTRY.items():
-            for rid, data in rules.items():
-                all_rules[rid.upper()] = (cat_name, data)
+        categories, all_rules = _rule_index()
 
         # 2. EMPTY INPUT SAFETY
         if not search_term:
@@ -381,6 +432,8 @@ class KubecuroCLI:
             
             self.console.print(f"\n[bold magenta]CATEGORY VIEW[/bold magenta] > [bold cyan]{actual_cat_name}[/bold cyan]")
             
+            import rich.box as box
+            from rich.table import Table
             table = Table(box=box.SIMPLE, header_style="bold magenta", expand=True)
             table.add_column("Rule ID", style="cyan", width=25)
             table.add_column("Logic / Impact Description")
@@ -402,6 +455,7 @@ class KubecuroCLI:
         # 5. FUZZY FALLBACK (Search across both Categories and Rule IDs)
         all_possible_keys = list(all_rules.keys()) + list(categories.keys())
         substring_matches = [k for k in all_possible_keys if search_term in k]
+        import difflib
         fuzzy_matches = difflib.get_close_matches(search_term, all_possible_keys, n=3, cutoff=0.5)
         
         suggestions = sorted(list(set(substring_matches + fuzzy_matches)))
@@ -414,6 +468,9 @@ class KubecuroCLI:
 
     def _render_rule_detail(self, rule_id, category, data):
         """Standardized Rich Panel for Rule Deep-Dives."""
+        import rich.box as box
+        from rich.panel import Panel
+
         self.console.print(f"\n[bold magenta]RULE EXPLAINER[/bold magenta] > [bold cyan]{rule_id}[/bold cyan]")
         
         self.console.print(Panel(
@@ -455,6 +512,7 @@ class KubecuroCLI:
 
         self._save_baseline(issues)
         
+        from rich.rule import Rule
         self.console.print(Rule(style="dim"))
         self.console.print(
             f"[bold green]🛡️ Baseline Created![/]\n"
@@ -467,44 +525,158 @@ class KubecuroCLI:
         self.console.print(f"[bold red]✘ {msg}[/]")
         sys.exit(1)
 
+# ═══════════════════════════════════════════════════════════════
+# PARALLEL HEALING (Process Pool Workers)
+# ═══════════════════════════════════════════════════════════════
+PARALLEL_THRESHOLD = 4  # Below this, pool start-up costs more than it saves
+_WORKER_HEALER = None  # Per-process Healer, built by _init_heal_worker
+
+def _heal_one(healer, fpath: str, apply_defaults: bool, dry_run: bool, text: Optional[str] = None) -> Tuple[Union[bool, Optional[str]], list]:
+    """
+    Unified Healer Route: Relies on Healer's internal two-pass logic.
+    Returns (healed text, codes) for a path, (changed, codes) for text the audit already
+    holds, and (None, []) when the heal fails.
+    """
+    try:
+        if text is not None:
+            # The audit only reads the codes: detect-only, so no document is round-trip emitted
+            # Same argument shape as heal_file's detect-only call, so both routes share memo entries
+            content, codes = healer.heal_content(text, True, apply_defaults, False)
+            return content is None or content != text, list(codes)  # None: a document was mutated
+        # We pass dry_run so the healer knows whether to log 'FIXED' or 'ISSUE'
+        content, codes = healer.heal_file(
+            file_path=fpath,
+            apply_fixes=True,
+            apply_defaults=apply_defaults,
+            dry_run=dry_run, 
+            return_content=True
+        )
+        return content, list(codes)
+    except Exception as e:
+        import logging
+        logging.error("Failed to process %s: %s", fpath, e)
+        return None, []
+
+def _init_heal_worker():
+    """Pool initializer: one Healer per worker process."""
+    from kubecuro.healer import Healer
+    global _WORKER_HEALER
+    _WORKER_HEALER = Healer()
+
+def _pool_heal(fpath: str, text: Optional[str], apply_defaults: bool, dry_run: bool) -> Tuple[Optional[str], list]:
+    return _heal_one(_WORKER_HEALER, fpath, apply_defaults, dry_run, text)
+
+def _parse_manifest(text: Optional[str]):
+    """Syntax-check parse of one manifest: its documents, the error that rejected it, or None when unread."""
+    if text is None:
+        return None
+    from kubecuro.utils.yaml_io import load_stream
+    try:
+        return load_stream(text)
+    except Exception as e:
+        return e  # Returned, not raised: YAML errors pickle back from pool workers with their marks
+
 # ═══════════════════════════════════════════════════════════════
 # S-TIER AUDIT ENGINE (Production Zero-Downtime)
 # ═══════════════════════════════════════════════
 class AuditEngineV2:
     """Production-grade analysis + healing engine."""
 
-    def _silent_healer(self, fpath: str) -> tuple[Optional[str], list]:
+    def _silent_healer(self, fpath: str, text: Optional[str] = None) -> tuple[Union[bool, Optional[str]], list]:
         """Unified Healer Route: Relies on Healer's internal two-pass logic."""
-        try:
-            # We pass self.dry_run so the healer knows whether to log 'FIXED' or 'ISSUE'
-            content, codes = linter_engine(
-                file_path=fpath,
-                apply_api_fixes=True,
-                apply_defaults=self.apply_defaults,
-                dry_run=self.dry_run, 
-                return_content=True
-            )
-            return content, list(codes)
-        except Exception as e:
-            logging.error(f"Failed to process {fpath}: {e}")
-            return None, []
+        return _heal_one(self.healer, fpath, self.apply_defaults, self.dry_run, text)
+
+    @contextmanager
+    def _heal_results(self, paths: List[str], texts: Optional[List[Optional[str]]] = None):
+        """Yields an iterator of _silent_healer results aligned with `paths`, fanned out over CPUs for larger batches."""
+        texts = texts or [None] * len(paths)
+        workers = min(os.cpu_count() or 1, len(paths))
+        if len(paths) < PARALLEL_THRESHOLD or workers < 2:
+            yield map(self._silent_healer, paths, texts)
+            return
+        from concurrent.futures import ProcessPoolExecutor
+        from functools import partial
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_heal_worker) as pool:
+            job = partial(_pool_heal, apply_defaults=self.apply_defaults, dry_run=self.dry_run)
+            yield pool.map(job, paths, texts, chunksize=4)
+
+    @contextmanager
+    def _parse_results(self, texts: List[Optional[str]]):
+        """Yields _parse_manifest results aligned with `texts`, parsed across CPUs for larger batches."""
+        workers = min(os.cpu_count() or 1, len(texts))
+        if len(texts) < PARALLEL_THRESHOLD or workers < 2:
+            yield map(_parse_manifest, texts)
+            return
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            yield pool.map(_parse_manifest, texts, chunksize=8)
+
+    @contextmanager
+    def _audit_heal_results(self, paths: List[str], texts: List[Optional[str]]):
+        """
+        Like _heal_results for the audit, which only reads the codes: manifests whose
+        content was healed by an earlier run are answered from the on-disk result cache,
+        and byte-identical manifests (overlay copies, rendered charts) are healed once.
+        Yields (changed, codes) per file. Heals run detect-only, whose codes match an
+        emitting heal's, so the cache entries do not depend on the emit mode.
+        """
+        cache = self.healer.result_cache
+        options = ("audit", self.apply_defaults)
+        keys = [cache.content_key(t, options) if t is not None else None for t in texts]
+        hits = [cache.get(k) if k is not None else None for k in keys]
+
+        # Per file: index of the heal job that answers it (None for a cache hit)
+        slots, first_seen = [], {}
+        job_paths, job_texts = [], []
+        for path, text, hit in zip(paths, texts, hits):
+            if hit is not None:
+                slots.append(None)
+                continue
+            job = first_seen.get(text) if text is not None else None
+            if job is None:
+                job = len(job_paths)
+                job_paths.append(path)
+                job_texts.append(text)
+                if text is not None:
+                    first_seen[text] = job
+            slots.append(job)
+
+        with self._heal_results(job_paths, job_texts) as fresh:
+            def merged():
+                fresh_iter, done = iter(fresh), []
+                for key, text, hit, job in zip(keys, texts, hits, slots):
+                    if hit is not None:
+                        yield (hit[0], sorted(hit[1]))
+                        continue
+                    if job == len(done):  # First file with this content: its heal is next in line
+                        changed, codes = next(fresh_iter)
+                        done.append((changed, codes))
+                        if key is not None and changed is not None:  # None: the heal failed
+                            cache.put(key, changed, set(codes))
+                    yield done[job]
+            yield merged()
     
     def __init__(self, target: Path, dry_run: bool, yes: bool, show_all: bool, baseline: set, apply_defaults: bool = False):
         self.target = Path(target)
         self.dry_run = dry_run
+        from rich.console import Console
         self.console = Console()
         self.yes = yes
         self.show_all = show_all
         self.baseline = baseline
         self.apply_defaults = apply_defaults
-        try:
-            from kubecuro.healer import linter_engine
-            self.healer = linter_engine
-        except ImportError:
-            self.healer = None
+        self._yaml_files: Optional[List[Path]] = None  # Discovery result, shared by audit/health/fix
+        # One Healer per run: YAML/Shield setup and the content memo are shared by scan + fix
+        from kubecuro.healer import Healer
+        self.healer = Healer()
 
     def execute(self, command: str):
         """Execute with S-Tier progress UX."""
+        import rich.box as box
+        from rich.align import Align
+        from rich.panel import Panel
+        from rich.text import Text
+
         cmd_key = command.lower().strip()
         icon = CONFIG.EMOJIS.get(cmd_key, "⚡\u00A0")
         
@@ -553,10 +725,11 @@ class AuditEngineV2:
         2. Logic Analysis (Shield) 
         3. Healer Recommendations (OOM/Resource Checks)
         """
-        from kubecuro.healer import linter_engine  # Efficient localized import
-        
-        syn = Synapse()
+        from kubecuro.synapse import Synapse
+        from kubecuro.shield import Shield
+
         shield = Shield()
+        syn = Synapse(shield=shield)
         issues = []
         seen = set()
         
@@ -573,111 +746,122 @@ class AuditEngineV2:
         problematic_files = []
         devnull = open(os.devnull, 'w')
 
-        for i, fpath in enumerate(files, 1):
-            abs_fpath = fpath.resolve()
-            fname_full = str(abs_fpath)
-            fname_short = fpath.name
-            current_file_has_issues = False
+        # Each manifest is read once; the text feeds the healer, the syntax check and Synapse
+        texts = self._read_manifests(files)
+
+        with self._parse_results(texts) as parse_results, \
+                self._audit_heal_results([str(f.resolve()) for f in files], texts) as heal_results:
+            for i, (fpath, content, parsed, healed) in enumerate(zip(files, texts, parse_results, heal_results), 1):
+                abs_fpath = fpath.resolve()
+                fname_full = str(abs_fpath)
+                fname_short = fpath.name
+                current_file_has_issues = False
             
-            # --- PHASE 1: SYNTAX CHECK ---
-            try:
-                content = fpath.read_text()
-                yaml_parser = ruamel.yaml.YAML(typ='safe')
-                yaml_parser.allow_duplicate_keys = True
-                # Load all docs to validate full file structure
-                list(yaml_parser.load_all(content))
-            except Exception as yaml_err:
-                # Syntax error detected! 
-                line_num = getattr(getattr(yaml_err, 'problem_mark', None), 'line', 1) + 1
-                ident = f"{fname_full}:SYNTAX_ERROR"
+                # --- PHASE 1: SYNTAX CHECK ---
+                try:
+                    if content is None:
+                        content = fpath.read_text()  # Unreadable: re-raise the read error as a finding
+                        parsed = _parse_manifest(content)
+                    # One libyaml pass validates the whole stream and yields the docs Synapse needs
+                    if isinstance(parsed, Exception):
+                        raise parsed
+                    parsed_docs = parsed
+                except Exception as yaml_err:
+                    # Syntax error detected! 
+                    line_num = getattr(getattr(yaml_err, 'problem_mark', None), 'line', 1) + 1
+                    ident = f"{fname_full}:SYNTAX_ERROR"
                 
-                if ident not in seen:
-                    issues.append(AuditIssue(
-                        code="SYNTAX_ERROR",
-                        severity="CRITICAL",
-                        file=fname_full,
-                        message=f"YAML syntax error: {str(yaml_err).split(':', 1)[-1].strip()}",
-                        line=line_num
-                    ))
-                    seen.add(ident)
+                    if ident not in seen:
+                        issues.append(AuditIssue(
+                            code="SYNTAX_ERROR",
+                            severity="CRITICAL",
+                            file=fname_full,
+                            message=f"YAML syntax error: {_yaml_error_summary(yaml_err)}",
+                            line=line_num
+                        ))
+                        seen.add(ident)
                 
-                problematic_files.append(fname_short)
-                if show_progress:
-                    console.print(f"  [{i:2d}/{total_files}] [dim]{fname_short:<35}[/] [bold red]✘[/]")
-                continue # Skip Shield/Synapse logic analysis as YAML is unparseable
-
-            # --- PHASE 2: LOGIC & HEALER ANALYSIS (Valid YAML Only) ---
-            try:
-                with contextlib.redirect_stderr(devnull):
-                    # 1. Logic Scan (Shield)
-                    syn.scan_file(str(fpath))
-                    docs = [d for d in syn.all_docs if d.get('_origin_file') == str(fpath)]
+                    problematic_files.append(fname_short)
+                    if show_progress:
+                        console.print(f"  [{i:2d}/{total_files}] [dim]{fname_short:<35}[/] [bold red]✘[/]")
+                    continue # Skip Shield/Synapse logic analysis as YAML is unparseable
+
+                # --- PHASE 2: LOGIC & HEALER ANALYSIS (Valid YAML Only) ---
+                try:
+                    with contextlib.redirect_stderr(devnull):
+                        # 1. Logic Scan (Shield)
+                        syn.scan_docs(fname_full, parsed_docs)
+                        # Only this file's docs can carry its tag: filter them instead of the growing registry
+                        docs = [d for d in parsed_docs if isinstance(d, dict) and d.get('_origin_file') == fname_full]
                     
-                    for doc in docs:
-                        for finding in shield.scan(doc, syn.all_docs):
-                            code = str(finding['code']).upper()
-                            if code in PRO_RULES and not is_pro_user():
-                                continue
+                        for doc in docs:
+                            # Per-resource checks only: cross-resource ones wait for the complete registry in syn.audit()
+                            try:
+                                findings = shield.scan(doc)
+                            except (AttributeError, TypeError, KeyError):
+                                continue  # Malformed document: the healer reports it as HEAL_SKIPPED below
+                            for finding in findings:
+                                # Interned: thousands of issues then share one object per rule code
+                                code = sys.intern(str(finding['code']).upper())
+                                if code in PRO_RULES and not is_pro_user():
+                                    continue
                                 
-                            line = finding.get('line', 1)
-                            ident = f"{fname_full}:{line}:{code}"
+                                line = finding.get('line', 1)
+                                ident = f"{fname_full}:{line}:{code}"
+                                if ident not in seen:
+                                    issues.append(AuditIssue(
+                                        code=code, 
+                                        severity=finding.get('severity', 'HIGH'),
+                                        file=fname_full, 
+                                        message=finding['msg'], 
+                                        line=line
+                                    ))
+                                    seen.add(ident)
+                                    current_file_has_issues = True
+
+                        # 2. Healer Scan (Resource Limits/Defaults)
+                        # Note: Results come from the (possibly parallel) healer pass started above
+                        _, codes = healed
+                        for code_entry in codes:
+                            parts = str(code_entry).split(":")
+                            ccode = sys.intern(parts[0].upper())
+                        
+                            # Filter out fixed flags and Pro rules
+                            if "FIXED" in ccode or (ccode in PRO_RULES and not is_pro_user()):
+                                continue
+                            # The healer only saw this file: cross-resource codes come from syn.audit() below
+                            if ccode in shield.CROSS_RESOURCE_CODES:
+                                continue
+                            
+                            line = int(parts[1]) if len(parts) > 1 and parts[1].strip().isdigit() else 1
+                            ident = f"{fname_full}:{line}:{ccode}"
+                        
                             if ident not in seen:
                                 issues.append(AuditIssue(
-                                    code=code, 
-                                    severity=finding.get('severity', 'HIGH'),
-                                    file=fname_full, 
-                                    message=finding['msg'], 
+                                    code=ccode,
+                                    severity="HIGH" if "OOM" in ccode else "MEDIUM",
+                                    file=fname_full,
+                                    message=HEALER_MESSAGES.get(ccode, f"Healer Recommendation: {ccode}"),
                                     line=line
                                 ))
                                 seen.add(ident)
                                 current_file_has_issues = True
 
-                    # 2. Healer Scan (Resource Limits/Defaults)
-                    # Note: We use the engine directly to avoid double-reading the file
-                    _, codes = self._silent_healer(fname_full)
-                    for code_entry in codes:
-                        parts = str(code_entry).split(":")
-                        ccode = parts[0].upper()
-                        
-                        # Filter out fixed flags and Pro rules
-                        if "FIXED" in ccode or (ccode in PRO_RULES and not is_pro_user()):
-                            continue
-                            
-                        line = int(parts[1]) if len(parts) > 1 and parts[1].strip().isdigit() else 1
-                        ident = f"{fname_full}:{line}:{ccode}"
-                        
-                        if ident not in seen:
-                            # Map healer codes to human-readable issues
-                            msg_map = {
-                                "OOM_RISK": "Container missing resource limits (Risk of OOMKill)",
-                                "LIVENESS_MISSING": "No Liveness Probe defined for container",
-                                "READINESS_MISSING": "No Readiness Probe defined for container"
-                            }
-                            issues.append(AuditIssue(
-                                code=ccode,
-                                severity="HIGH" if "OOM" in ccode else "MEDIUM",
-                                file=fname_full,
-                                message=msg_map.get(ccode, f"Healer Recommendation: {ccode}"),
-                                line=line
-                            ))
-                            seen.add(ident)
-                            current_file_has_issues = True
-
-                # --- PHASE 3: PROGRESS UX ---
-                if current_file_has_issues:
-                    problematic_files.append(fname_short)
+                    # --- PHASE 3: PROGRESS UX ---
+                    if current_file_has_issues:
+                        problematic_files.append(fname_short)
                 
-                if show_progress:
-                    status_icon = "[bold yellow]⚠[/]" if current_file_has_issues else "[bold green]✓[/]"
-                    console.print(f"  [{i:2d}/{total_files}] [dim]{fname_short:<35}[/] {status_icon}")
-                elif current_file_has_issues and len(problematic_files) <= 10:
-                     # Peek for summary mode
-                     console.print(f"  [yellow]⚠[/][dim] {fname_short}[/]")
-
-            except Exception as e:
-                if show_progress:
-                    console.print(f"  [{i:2d}/{total_files}] [dim]{fname_short:<35}[/] [bold red]ERR[/]")
-                console.print(f"[dim]Logic scan failed for {fname_short}: {e}[/dim]")
+                    if show_progress:
+                        status_icon = "[bold yellow]⚠[/]" if current_file_has_issues else "[bold green]✓[/]"
+                        console.print(f"  [{i:2d}/{total_files}] [dim]{fname_short:<35}[/] {status_icon}")
+                    elif current_file_has_issues and len(problematic_files) <= 10:
+                         # Peek for summary mode
+                         console.print(f"  [yellow]⚠[/][dim] {fname_short}[/]")
+
+                except Exception as e:
+                    if show_progress:
+                        console.print(f"  [{i:2d}/{total_files}] [dim]{fname_short:<35}[/] [bold red]ERR[/]")
+                    console.print(f"[dim]Logic scan failed for {fname_short}: {e}[/dim]")
 
         devnull.close()
         
@@ -703,10 +887,26 @@ class AuditEngineV2:
         return issues
     
     def _find_yaml_files(self) -> List[Path]:
-        """Smart YAML discovery."""
-        if self.target.is_file() and self.target.suffix.lower() in {'.yaml', '.yml'}:
-            return [self.target]
-        return list(self.target.rglob("*.yaml")) + list(self.target.rglob("*.yml"))
+        """Smart YAML discovery (single os.scandir walk; DirEntry caches the type checks)."""
+        if self._yaml_files is not None:
+            return self._yaml_files
+        if self.target.is_file() and self.target.suffix.lower() in YAML_SUFFIXES:
+            self._yaml_files = [self.target]
+            return self._yaml_files
+        found, pending = [], [str(self.target)]
+        while pending:
+            try:
+                with os.scandir(pending.pop()) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(entry.path)
+                        elif entry.name.endswith(YAML_SUFFIXES) and entry.is_file():
+                            found.append(Path(entry.path))
+            except OSError:
+                continue
+        # Fixes rewrite files in place (backups end in .backup), so the set is stable for the run
+        self._yaml_files = found
+        return found
     
     def _filter_baseline(self, issues: List[AuditIssue]) -> List[AuditIssue]:
         """Filter suppressed issues."""
@@ -724,14 +924,20 @@ class AuditEngineV2:
     
     def _render_spectacular_scan(self, issues: List[AuditIssue]):
         """S-Tier animated results."""
+        from rich.align import Align
+        from rich.padding import Padding
+        from rich.panel import Panel
+        from rich.table import Table
+
         if not issues:
             console.print(Padding(Align.center(Panel("[bold green]🎉 PERFECT CLUSTER HEALTH[/]", border_style="green", expand=False)), (1, 0)))
             return
         
-        # Severity dashboard - FIXED COUNTING LOGIC
-        high_count = len([i for i in issues if 'HIGH' in i.severity or 'CRITICAL' in i.severity])
-        med_count = len([i for i in issues if 'MEDIUM' in i.severity])
-        low_count = len([i for i in issues if 'LOW' in i.severity or 'INFO' in i.severity])
+        # Severity dashboard counts every issue by its severity, syntax errors included
+        ranks = Counter(_severity_rank(i.severity) for i in issues)
+        high_count = ranks["critical"] + ranks["high"]
+        med_count = ranks["medium"]
+        low_count = ranks["low"]
         
         severity_table = Table.grid(expand=True)
         severity_table.add_row(
@@ -739,15 +945,29 @@ class AuditEngineV2:
             Panel(f"[bold yellow]🟡 WARNING\n{med_count}[/]", style="yellow", expand=False),
             Panel(f"[bold green]🟢 INFO\n{low_count}[/]", style="green", expand=False)
         )
-        console.print(severity_table)
-        
-        # Per-file detailed tables
-        for fname, file_issues in self._group_by_file(issues).items():
-            full_path = os.path.abspath(os.path.join(self.target, fname))
-            console.print(f"\n📂 [bold cyan]{fname}[/]")
-            self._render_file_table(file_issues)
-        
-        self._health_score_panel(issues)
+        # The whole report (dashboard, per-file tables, health panel) goes out in one buffered write
+        with console:
+            console.print(severity_table)
+            
+            # Per-file detailed tables
+            for fname, file_issues in self._group_by_file(issues).items():
+                full_path = os.path.abspath(os.path.join(self.target, fname))
+                console.print(f"\n📂 [bold cyan]{fname}[/]")
+                self._render_file_table(file_issues)
+            
+            self._health_score_panel(issues)
+
+    def _severity_buckets(self, issues: List[AuditIssue]) -> Dict[str, List[AuditIssue]]:
+        """Single pass over issues: syntax errors plus HIGH/MEDIUM/LOW logic findings."""
+        buckets = {"syntax": [], "high": [], "medium": [], "low": []}
+        for issue in issues:
+            if issue.code == "SYNTAX_ERROR":
+                buckets["syntax"].append(issue)
+                continue
+            rank = _severity_rank(issue.severity)
+            if rank:
+                buckets["high" if rank == "critical" else rank].append(issue)
+        return buckets
     
     def _group_by_file(self, issues: List[AuditIssue]) -> Dict[str, List[AuditIssue]]:
         """Group issues by filename."""
@@ -758,10 +978,12 @@ class AuditEngineV2:
 
     def _render_file_table(self, issues: List[AuditIssue]):
         """Rich per-file table with integrated summary footer."""
+        import rich.box as box
+        from rich.table import Table
     
         # 1. Pre-calculate totals for the footer
         total = len(issues)
-        high_count = sum(1 for i in issues if "HIGH" in i.severity.upper() or "CRITICAL" in i.severity.upper())
+        high_count = sum(1 for i in issues if _severity_rank(i.severity) in ("critical", "high"))
 
         # 2. Define the Table with Footer enabled
         table = Table(
@@ -787,16 +1009,7 @@ class AuditEngineV2:
         
         # 3. Populate Rows
         for issue in sorted(issues, key=lambda x: x.line or 0):
-            sev_upper = issue.severity.upper()
-            if "CRITICAL" in sev_upper:
-                color = "bright_red"
-            elif "HIGH" in sev_upper:
-                color = "orange3"
-            elif "MEDIUM" in sev_upper:
-                color = "yellow"
-            else:
-                color = "green"
-                
+            color = _SEVERITY_COLORS.get(_severity_rank(issue.severity), "green")
             table.add_row(
                 f"[{color}]{issue.severity}[/{color}]",
                 str(issue.line or "-"),
@@ -810,9 +1023,20 @@ class AuditEngineV2:
         """
         S-Tier Integrated Health Matrix with Syntax vs. Logic sub-scoring.
         """
+        import rich.box as box
+        from rich.columns import Columns
+        from rich.console import Group
+        from rich.padding import Padding
+        from rich.panel import Panel
+        from rich.progress import ProgressBar
+        from rich.rule import Rule
+        from rich.table import Table
+        from rich.text import Text
+
         # 1. DATA PREP: CALCULATE METRICS
         total_files = len(self._find_yaml_files())
-        syntax_errors = [i for i in issues if i.code == "SYNTAX_ERROR"]
+        buckets = self._severity_buckets(issues)
+        syntax_errors = buckets["syntax"]
         
         # Calculate Syntax Integrity %
         if total_files > 0:
@@ -821,10 +1045,7 @@ class AuditEngineV2:
             syntax_score = 100
 
         # Logic Deductions (Excluding syntax errors to avoid double-counting)
-        logic_issues = [i for i in issues if i.code != "SYNTAX_ERROR"]
-        high = [i for i in logic_issues if 'HIGH' in i.severity.upper() or 'CRITICAL' in i.severity.upper()]
-        med = [i for i in logic_issues if 'MEDIUM' in i.severity.upper()]
-        low = [i for i in logic_issues if 'LOW' in i.severity.upper() or 'INFO' in i.severity.upper()]
+        high, med, low = buckets["high"], buckets["medium"], buckets["low"]
         
         # Deduct 15 for High, 5 for Med, 2 for Low
         logic_deduction = (len(high) * 15) + (len(med) * 5) + (len(low) * 2)
@@ -919,6 +1140,7 @@ class AuditEngineV2:
 
     def _execute_zero_downtime_fixes(self):
         """Production-grade atomic fixes with raw-recovery for syntax errors."""
+        from rich.errors import MarkupError
         files = self._find_yaml_files()
         if not files:
             console.print("[yellow]No YAML files found[/]")
@@ -933,47 +1155,51 @@ class AuditEngineV2:
         problematic_files = []
         global_codes = set()  # <--- TRACK ALL CODES FOR SUMMARY
         
-        for i, fpath in enumerate(files, 1):
-            original = self._safe_read(fpath)
-            # Ensure the healer returns the codes set
-            fixed_content, codes = self._silent_healer(str(fpath))
-
-            has_changed = (
-                isinstance(fixed_content, str) and 
-                fixed_content.strip() and 
-                fixed_content.strip() != original.strip()
-            )
-
-            if has_changed:
-                if self._atomic_fix(fpath, original, fixed_content):
-                    fixed_count += 1
-                    problematic_files.append(fpath.name)
-                    global_codes.update(codes) # <--- ADD TO ACCUMULATOR
+        # Healing fans out over CPUs like the audit; writes stay serial and atomic below
+        with self._heal_results([str(f) for f in files]) as heal_results:
+            for i, (fpath, healed) in enumerate(zip(files, heal_results), 1):
+                original = self._safe_read(fpath)
+                # Ensure the healer returns the codes set
+                fixed_content, codes = healed
+
+                has_changed = (
+                    isinstance(fixed_content, str) and 
+                    fixed_content != original and 
+                    fixed_content.strip() and 
+                    fixed_content.strip() != original.strip()
+                )
+
+                if has_changed:
+                    if self._atomic_fix(fpath, original, fixed_content):
+                        fixed_count += 1
+                        problematic_files.append(fpath.name)
+                        global_codes.update(codes) # <--- ADD TO ACCUMULATOR
                     
-                    # Real-time per-file logging
-                    printed_msgs = set()
-                    for code in codes:
-                        code_str = str(code).upper()
-                        msg = None
-                        if "OOM_FIXED" in code_str: msg = "Applied resource limits"
-                        elif "SYNTAX" in code_str: msg = "Fixed indentation/tabs"
-                        elif "COLON" in code_str: msg = "Injected missing colons" # Added for your new logic
-                        elif "SEC_PRIVILEGED" in code_str: msg = "Hardened security context"
-                        elif "SVC_SELECTOR_FIXED" in code_str: msg = "Repaired Service selector"
-                        elif "API" in code_str or "FIX_SELECTOR" in code_str: msg = "Migrated deprecated API"
-
-                        if msg and msg not in printed_msgs:
-                            try:
-                                parts = code_str.split(":")
-                                line_info = f"Line {parts[1]}" if (len(parts) > 1 and parts[1].strip()) else "Global"
-                                console.print(f"    [bold blue]💡 {line_info}:[/] [dim]{msg} in {fpath.name}.[/]")
-                                printed_msgs.add(msg)
-                            except: pass
-
-            if show_progress:
-                file_status = "yellow" if has_changed else "green"
-                status_icon = "✓" if has_changed else "ok"
-                console.print(f"  [{i:2d}/{len(files)}] [dim]{fpath.name:<35}[/] [bold {file_status}]{status_icon}[/]")
+                        # Real-time per-file logging
+                        printed_msgs = set()
+                        for code in codes:
+                            code_str = str(code).upper()
+                            msg = None
+                            if "OOM_FIXED" in code_str: msg = "Applied resource limits"
+                            elif "SYNTAX" in code_str: msg = "Fixed indentation/tabs"
+                            elif "COLON" in code_str: msg = "Injected missing colons" # Added for your new logic
+                            elif "SEC_PRIVILEGED" in code_str: msg = "Hardened security context"
+                            elif "SVC_SELECTOR_FIXED" in code_str: msg = "Repaired Service selector"
+                            elif "API" in code_str or "FIX_SELECTOR" in code_str: msg = "Migrated deprecated API"
+
+                            if msg and msg not in printed_msgs:
+                                try:
+                                    parts = code_str.split(":")
+                                    line_info = f"Line {parts[1]}" if (len(parts) > 1 and parts[1].strip()) else "Global"
+                                    console.print(f"    [bold blue]💡 {line_info}:[/] [dim]{msg} in {fpath.name}.[/]")
+                                    printed_msgs.add(msg)
+                                except MarkupError:
+                                    pass  # A file name that reads as Rich markup: skip its detail line, not the run
+
+                if show_progress:
+                    file_status = "yellow" if has_changed else "green"
+                    status_icon = "✓" if has_changed else "ok"
+                    console.print(f"  [{i:2d}/{len(files)}] [dim]{fpath.name:<35}[/] [bold {file_status}]{status_icon}[/]")
         
         # PASS GLOBAL CODES TO SUMMARY
         self._render_fix_summary(fixed_count, len(files), problematic_files, global_codes)
@@ -1032,6 +1258,23 @@ class AuditEngineV2:
                   friendly_name = code.replace('_', ' ').title()
                   content.append(f" [success]✓[/success] {friendly_name}")
   
+    def _read_manifest(self, fpath: Path) -> Optional[str]:
+        """Reads a manifest once for the whole scan; None if it cannot be read or decoded."""
+        from kubecuro.utils.yaml_io import read_manifest
+        try:
+            return read_manifest(str(fpath))
+        except (OSError, UnicodeDecodeError):
+            return None
+
+    def _read_manifests(self, files: List[Path]) -> List[Optional[str]]:
+        """Reads a batch of manifests in file order; larger batches overlap their I/O on threads."""
+        if len(files) < PARALLEL_THRESHOLD:
+            return [self._read_manifest(f) for f in files]
+        # The read syscalls release the GIL; the CPU-bound healing stays on the process pool
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor() as pool:
+            return list(pool.map(self._read_manifest, files))
+
     def _safe_read(self, fpath: Path) -> str:
         """Safe file read."""
         try:
@@ -1138,6 +1381,7 @@ def create_parser() -> argparse.ArgumentParser:
     options_group.add_argument("--all", action="store_true", help="Show baseline/suppressed issues")
     options_group.add_argument("--dry-run", action="store_true", help="Preview changes (no disk write)")    
     options_group.add_argument("--apply-defaults", action="store_true", help="Inject conservative defaults (e.g. CPU/Mem limits) if missing")
+    options_group.add_argument("--no-cache", action="store_true", help="Ignore and don't write the local result cache")
 
     # 2. Standardize Commands Group
     # Metavar="COMMAND" ensures it appears as uppercase in 'usage'
@@ -1147,25 +1391,35 @@ def create_parser() -> argparse.ArgumentParser:
         title=pos_title
     )
     
+    # Completers are only consulted by argcomplete, so only build them when completing
+    files_completer = None
+    if "_ARGCOMPLETE" in os.environ:
+        from argcomplete.completers import FilesCompleter
+        files_completer = FilesCompleter()
+
     # Standardized help strings with consistent \u00A0 spacing
     # --- SCAN COMMAND ---
     scan_p = subparsers.add_parser("scan", help="🔍 Scan manifests for logic errors")
     target_scan = scan_p.add_argument("target", help="Path to scan (file or directory)")
-    target_scan.completer = FilesCompleter() # ⚡ Enables Tab completion for paths
+    target_scan.completer = files_completer # ⚡ Enables Tab completion for paths
     scan_p.add_argument("--all", action="store_true", help="Show all issues, including baselined")
+    # SUPPRESS: when omitted here, a --no-cache given before the command still counts
+    scan_p.add_argument("--no-cache", action="store_true", default=argparse.SUPPRESS, help="Ignore and don't write the local result cache")
     
 
     # --- FIX COMMAND ---
     fix_p = subparsers.add_parser("fix", help="❤️\u00A0 Auto-heal YAML files")
     target_fix = fix_p.add_argument("target", help="Path to file or directory")
-    target_fix.completer = FilesCompleter() # ⚡ Enables Tab completion for paths
+    target_fix.completer = files_completer # ⚡ Enables Tab completion for paths
     fix_p.add_argument("-y", "--yes", action="store_true", help="Skip confirmation prompts")
     fix_p.add_argument("--dry-run", action="store_true", help="Show changes without writing to disk")
     fix_p.add_argument("--apply-defaults", action="store_true", help="Inject missing resource limits/probes")
+    fix_p.add_argument("--no-cache", action="store_true", default=argparse.SUPPRESS, help="Ignore and don't write the local result cache")
 
     # --- BASELINE COMMAND ---
     base_p = subparsers.add_parser("baseline", help="🛡️\u00A0 Suppress current issues into a baseline file")
     base_p.add_argument("target", nargs="?", default=".", help="Directory to baseline")
+    base_p.add_argument("--no-cache", action="store_true", default=argparse.SUPPRESS, help="Ignore and don't write the local result cache")
 
     # --- CHECKLIST COMMAND ---
     subparsers.add_parser("checklist", help="📋 Show the production-grade logic arsenal")
@@ -1184,11 +1438,12 @@ def main():
     """S-Tier entrypoint."""
     parser = create_parser()
     
-    # Tab completion (production-grade)
+    # Tab completion (production-grade): argcomplete is a no-op unless the shell hook set _ARGCOMPLETE
     if "COMP_LINE" in os.environ:
         parser.error = lambda _: None
-    argcomplete.autocomplete(parser)
     if "_ARGCOMPLETE" in os.environ:
+        import argcomplete
+        argcomplete.autocomplete(parser)
         sys.exit(0)
 
     # Capture unknown args for the smart resolver
@@ -1198,6 +1453,11 @@ def main():
     if args.command is None and not args.version:
         parser.print_help()
         sys.exit(0)
+
+    if args.command in ENGINE_COMMANDS:
+        _configure_runtime()
+    if args.no_cache:
+        os.environ['KUBECURO_NO_CACHE'] = '1'  # Read by every ResultCache, pool workers included
     
     cli = KubecuroCLI()
     try:
@@ -1214,4 +1474,7 @@ def run():
     main()
 
 if __name__ == "__main__":
+    # Required for the process pool inside PyInstaller one-file binaries
+    import multiprocessing
+    multiprocessing.freeze_support()
     main()
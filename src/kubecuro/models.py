@@ -1,7 +1,11 @@
+import sys
 from dataclasses import dataclass
 from typing import Optional
 
-@dataclass
+# Slotted instances (3.10+) drop the per-issue __dict__; older interpreters keep a plain dataclass
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(frozen=True, **_SLOTS)
 class AuditIssue:
     """Production-grade audit issue model."""
     # ✅ Required fields FIRST
@@ -11,6 +15,8 @@ class AuditIssue:
     line: Optional[int] = None
     severity: str = "🟢 LOW"
     message: str = ""
+    fix: str = ""     # Remediation hint (Synapse correlations)
+    source: str = ""  # Engine that raised the issue
     
     def is_critical(self) -> bool:
         """Check if issue is critical."""
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 import logging
 import re
+from typing import Optional
 """
 --------------------------------------------------------------------------------
 AUTHOR:         Nishar A Sunkesala / FixMyK8s
@@ -8,6 +9,21 @@ PURPOSE:         The Shield Engine: API Deprecation, Resource Stability,
                   and RBAC Security Guard.
 --------------------------------------------------------------------------------
 """
+
+# --- PRE-COMPILED REGEX SHIELD PATTERNS ---
+_RE_EMPTY_DOC = re.compile(r'^---\s*$', re.MULTILINE)
+_RE_IMAGE_TRAILING_COLON = re.compile(r'(image:\s*)"([^"]+)"\s*:')
+_RE_IMAGE_MULTI_COLON = re.compile(r'image:\s*[:\s]{2,}')
+_RE_IMAGE_COLON_RUN = re.compile(r'(image:\s*)[:\s]+')
+_RE_DRIFTED_CMD = re.compile(r'^\s+(command|args):')
+_RE_LEADING_WS = re.compile(r'^(\s*)')
+
+# --- KIND / VERB SETS (hashed membership; ruamel scalar strings hash like str) ---
+_WORKLOAD_KINDS = frozenset({'Deployment', 'Pod', 'StatefulSet', 'DaemonSet', 'CronJob', 'Job'})
+_LIMIT_KINDS = _WORKLOAD_KINDS - {'Pod'}
+_RBAC_KINDS = frozenset({"Role", "ClusterRole"})
+_HPA_TARGET_KINDS = frozenset({'Deployment', 'StatefulSet'})
+_SECRET_READ_VERBS = ("*", "get", "list", "watch")
 class Shield:
     """The Stability Engine: Standardized with Professional Severity Levels."""
     
@@ -18,8 +34,45 @@ class Shield:
     MEDIUM   = "🟡 MEDIUM"    # Deprecations/Best practices
     LOW      = "🔵 INFO"      # Hardening/Audit suggestions
 
+    # Codes that depend on other resources. A full audit takes them from Synapse.audit(), which
+    # sees the complete registry; per-file scans only know part of it.
+    CROSS_RESOURCE_CODES = frozenset({"HPA_ORPHAN", "HPA_MISSING_REQ", "INGRESS_ORPHAN", "INGRESS_PORT_MISMATCH"})
+
     def __init__(self):
         self.logger = logging.getLogger(__name__)
+        # Lookup index over the last `all_docs` list seen; callers only ever append to that list
+        self._index_src = None
+        self._index_len = 0
+        self._services = {}      # (name, namespace) -> first Service
+        self._hpa_targets = {}   # name -> first Deployment/StatefulSet
+
+    def _index_docs(self, all_docs: list):
+        """Brings the cross-resource lookup index up to date with `all_docs`, indexing only new entries."""
+        if all_docs is not self._index_src or len(all_docs) < self._index_len:
+            self._index_src, self._index_len = all_docs, 0
+            self._services, self._hpa_targets = {}, {}
+        for i in range(self._index_len, len(all_docs)):
+            d = all_docs[i]
+            md = d.get('metadata', {}) if isinstance(d, dict) else None
+            if not isinstance(md, dict):
+                continue
+            try:
+                kind = d.get('kind')
+                if kind == 'Service':
+                    self._services.setdefault((md.get('name'), md.get('namespace', 'default')), d)
+                elif kind in _HPA_TARGET_KINDS:
+                    self._hpa_targets.setdefault(md.get('name'), d)
+            except TypeError:
+                pass  # Unhashable kind/name/namespace: never a valid reference target
+        self._index_len = len(all_docs)
+
+    @staticmethod
+    def _lookup(index: dict, key):
+        """Index probe that treats an unhashable reference (a list where a name belongs) as unresolved."""
+        try:
+            return index.get(key)
+        except TypeError:
+            return None
 
     def add_finding(self, code, severity, msg, line):
         """Helper to standardize finding structure."""
@@ -55,22 +108,30 @@ class Shield:
         "flowcontrol.apiserver.k8s.io/v1beta2": "flowcontrol.apiserver.k8s.io/v1beta3",
         "apiregistration.k8s.io/v1beta1": "apiregistration.k8s.io/v1"
     }
+    # Read-only key set for the hot 'is this API retired?' membership test
+    DEPRECATED_APIS = frozenset(DEPRECATIONS)
+    # The same table flattened to (apiVersion, kind) -> replacement; (apiVersion, None) is the group fallback
+    UPGRADE_PATHS = {
+        **{(api, None): (m.get("default") if isinstance(m, dict) else m) for api, m in DEPRECATIONS.items()},
+        **{(api, k): v for api, m in DEPRECATIONS.items() if isinstance(m, dict) for k, v in m.items() if k != "default"},
+    }
+
+    def upgrade_for(self, api: str, kind) -> Optional[str]:
+        """Replacement apiVersion for a retired API, resolved per kind with direct dict probes."""
+        target = self.UPGRADE_PATHS.get((api, kind))
+        return target if target is not None else self.UPGRADE_PATHS.get((api, None))
 
     def get_line(self, doc, key=None):
-        """Helper to extract line number from ruamel.yaml-parsed dict."""
-        try:
-            if doc is None:
-                return 1
-            
-            if key and hasattr(doc, 'lc') and hasattr(doc.lc, 'data') and key in doc.lc.data:
-                return doc.lc.data[key][0] + 1
-            
-            if hasattr(doc, 'lc') and hasattr(doc.lc, 'line'):
-                return doc.lc.line + 1
-            
-            return 1
-        except Exception:
+        """Helper to extract line number from a parsed dict carrying ruamel-style `lc` data."""
+        lc = getattr(doc, 'lc', None)
+        if lc is None:
             return 1
+        if key:
+            data = getattr(lc, 'data', None)
+            if data is not None and key in data:
+                return data[key][0] + 1
+        line = getattr(lc, 'line', None)
+        return line + 1 if line is not None else 1
 
     def scan(self, doc: dict, all_docs: list = None) -> list:
         """
@@ -80,8 +141,6 @@ class Shield:
             self.logger.debug("Empty or invalid document skipped")
             return []
     
-        # Get the starting line of the resource for fallback
-        base_line = self.get_line(doc)
         raw_findings = []
     
         # 1. API Version & Pod Security (Triggers: ROOT_USER_UID, PRIV_ESC_TRUE, RO_ROOT_FS)
@@ -99,6 +158,12 @@ class Shield:
             raw_findings.extend(self.audit_hpa(doc, all_docs))
             raw_findings.extend(self.check_ingress_service_alignment(doc, all_docs))
     
+        return self._anchor(doc, raw_findings)
+
+    def _anchor(self, doc: dict, raw_findings: list) -> list:
+        """Normalizes finding codes and falls back to the resource's first line where none was set."""
+        # Get the starting line of the resource for fallback
+        base_line = self.get_line(doc)
         # --- Line Number Attachment & Consistency Check ---
         # This ensures the UI points to the correct line in the IDE
         for f in raw_findings:
@@ -111,13 +176,32 @@ class Shield:
         
         return raw_findings
 
+    def scan_all(self, all_docs: list):
+        """
+        Runs the registry-wide checks over a complete registry, yielding (doc, findings)
+        per document. Per-resource checks are left to scan(), and Ingress -> Service
+        alignment to Synapse, so a full audit reports each finding once.
+        The cross-resource index is built once up front and shared by every check;
+        documents a checker cannot walk are skipped.
+        """
+        if all_docs:
+            self._index_docs(all_docs)
+        for doc in all_docs:
+            if not isinstance(doc, dict):
+                continue
+            try:
+                findings = self._anchor(doc, self.audit_hpa(doc, all_docs))
+            except (AttributeError, TypeError, KeyError):
+                # Malformed document (e.g. a list where a mapping belongs): keep scanning the rest
+                self.logger.debug("Shield scan skipped for malformed document", exc_info=True)
+                continue
+            yield doc, findings
+
     def check_limits(self, doc):
         """Detects missing resource limits to prevent OOMKills."""
         findings = []
         kind = doc.get('kind')
-        workloads = ['Deployment', 'StatefulSet', 'DaemonSet', 'Job', 'CronJob']
-        
-        if kind in workloads:
+        if kind in _LIMIT_KINDS:
             spec = doc.get('spec', {}) or {}
             
             # Consistent Navigation Logic
@@ -165,9 +249,8 @@ class Shield:
                 if not target_svc: 
                     continue
     
-                matched_svc = next((d for d in all_docs if d.get('kind') == 'Service' 
-                                   and d.get('metadata', {}).get('name') == target_svc
-                                   and d.get('metadata', {}).get('namespace', 'default') == ingress_ns), None)
+                self._index_docs(all_docs)
+                matched_svc = self._lookup(self._services, (target_svc, ingress_ns))
                     
                 if matched_svc:
                       svc_spec_ports = matched_svc.get('spec', {}).get('ports', [])
@@ -210,9 +293,8 @@ class Shield:
         name = doc.get('metadata', {}).get('name', 'unknown')
         
         # 1. API Deprecation Check
-        if api in self.DEPRECATIONS:
-            mapping = self.DEPRECATIONS[api]
-            better = mapping.get(kind, mapping.get("default")) if isinstance(mapping, dict) else mapping
+        if str(api) in self.DEPRECATED_APIS:
+            better = self.upgrade_for(str(api), kind)
             findings.append(self.add_finding(
                 "API_DEPRECATED",
                 self.MEDIUM,
@@ -221,8 +303,7 @@ class Shield:
             ))
         
         # 2. Workload Security Checks (Pod, Deployment, etc.)
-        workloads = ['Deployment', 'Pod', 'StatefulSet', 'DaemonSet', 'CronJob', 'Job']
-        if kind in workloads:
+        if kind in _WORKLOAD_KINDS:
             spec = doc.get('spec') or {}
             
             # Navigate to the actual Pod Spec (t_spec)
@@ -266,7 +347,7 @@ class Shield:
         name = resource.get('metadata', {}).get('name', 'unknown')
         rules = resource.get("rules") or resource.get("spec", {}).get("rules", [])
 
-        if kind in ["Role", "ClusterRole"]:
+        if kind in _RBAC_KINDS:
             for rule in rules:
                 verbs = rule.get("verbs", [])
                 res_list = rule.get("resources", [])
@@ -278,7 +359,7 @@ class Shield:
                         f"🚨 Security Risk: {kind} '{name}' uses global wildcards (*).",
                         self.get_line(rule)
                     ))
-                elif "secrets" in res_list and any(v in verbs for v in ["*", "get", "list", "watch"]):
+                elif "secrets" in res_list and any(v in verbs for v in _SECRET_READ_VERBS):
                     findings.append(self.add_finding(
                         "RBAC_SECRET",
                         self.MEDIUM,
@@ -302,8 +383,8 @@ class Shield:
             if m.get('type') == 'Resource':
                 metrics.append(m['resource']['name'])
     
-        workload = next((d for d in all_docs if d.get('metadata', {}).get('name') == t_name 
-                         and d.get('kind') in ['Deployment', 'StatefulSet']), None)
+        self._index_docs(all_docs)
+        workload = self._lookup(self._hpa_targets, t_name)
     
         if not workload:
             # ✅ FIXED: Use add_finding and MEDIUM constant
@@ -324,7 +405,8 @@ class Shield:
                         "HPA_MISSING_REQ",
                         self.HIGH,
                         f"HPA scales on {metric}, but container '{c.get('name')}' lacks {metric} requests.",
-                        self.get_line(c)
+                        # Anchor to the HPA itself: the container may live in another document or file
+                        self.get_line(hpa_doc)
                     ))
         return findings
       
@@ -337,18 +419,20 @@ class RegexShield:
         original = text
 
         # 0. FIX: Detect and "Ghost" empty documents
-        if re.search(r'^---\s*$', text, re.MULTILINE) and not text.strip().replace('---', ''):
+        if not text.strip().replace('---', '') and _RE_EMPTY_DOC.search(text):
             fixes.append("SYNTAX_EMPTY_DOCUMENT")
             return "", fixes  # Return empty string to signify this block should be dropped
         
         # 1. FIX: Multi-colon or Trailing colon on image lines
-        if re.search(r'(image:\s*)"([^"]+)"\s*:', text):
-            text = re.sub(r'(image:\s*)"([^"]+)"\s*:', r'\1"\2"', text)
-            fixes.append("SYNTAX_REPAIRED")
+        # Cheap substring guards first; subn rewrites and reports in a single scan
+        if "image:" in text:
+            text, count = _RE_IMAGE_TRAILING_COLON.subn(r'\1"\2"', text)
+            if count:
+                fixes.append("SYNTAX_REPAIRED")
         
-        if re.search(r'image:\s*[:\s]{2,}', text):
-            text = re.sub(r'(image:\s*)[:\s]+', r'\1', text)
-            fixes.append("SYNTAX_REPAIRED")
+            if _RE_IMAGE_MULTI_COLON.search(text):
+                text = _RE_IMAGE_COLON_RUN.sub(r'\1', text)
+                fixes.append("SYNTAX_REPAIRED")
 
         # 2. Fixing 'tag: latest' spaces inside quotes
         if ": latest" in text:
@@ -357,6 +441,10 @@ class RegexShield:
 
         # 3. ELASTIC Indentation Fixer:
         # Matches the indentation of the PREVIOUS line to maintain block integrity.
+        # Only documents that mention command/args can need it.
+        if "command:" not in text and "args:" not in text:
+            return text, fixes
+
         lines = text.splitlines()
         fixed_lines = []
         
@@ -364,10 +452,10 @@ class RegexShield:
             current_line = lines[i]
             
             # Check if this line is a drifted 'command' or 'args'
-            if i > 0 and re.search(r'^\s+(command|args):', current_line):
+            if i > 0 and _RE_DRIFTED_CMD.search(current_line):
                 # Get the indentation of the previous line (e.g., 'image:' or 'name:')
                 prev_line = lines[i-1]
-                prev_indent_match = re.match(r'^(\s*)', prev_line)
+                prev_indent_match = _RE_LEADING_WS.match(prev_line)
                 
                 if prev_indent_match:
                     target_indent = prev_indent_match.group(1)
@@ -380,7 +468,7 @@ class RegexShield:
             fixed_lines.append(current_line)
         
         text = "\n".join(fixed_lines)
-        if text.strip() != original.strip() and "SYNTAX_REPAIRED" not in fixes:
+        if "SYNTAX_REPAIRED" not in fixes and text.strip() != original.strip():
             fixes.append("SYNTAX_REPAIRED")
             
         return text, fixes
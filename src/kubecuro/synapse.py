@@ -5,26 +5,44 @@ AUTHOR:      Nishar A Sunkesala / FixMyK8s
 PURPOSE:      The Synapse Engine: Maps cross-resource logic gaps.
 --------------------------------------------------------------------------------
 """
-import os
-from typing import List
-from ruamel.yaml import YAML
-
-# Robust model import
-try:
-    from kubecuro.models import AuditIssue
-except ImportError:
+import sys
+from types import MappingProxyType
+from typing import List, Optional
+from yaml import YAMLError
+
+from kubecuro.models import AuditIssue
+from kubecuro.shield import Shield
+from kubecuro.utils.yaml_io import load_stream, read_manifest
+
+_WORKLOAD_KINDS = frozenset({'Deployment', 'Pod', 'StatefulSet', 'DaemonSet', 'CronJob', 'Job'})
+_CONFIG_KINDS = frozenset({'ConfigMap', 'Secret'})
+_PROBE_TYPES = ('livenessProbe', 'readinessProbe', 'startupProbe')
+_EMPTY = MappingProxyType({})  # Shared read-only default for absent sections: no throwaway dict per lookup
+
+def _interned(value):
+    """sys.intern for exact str values; ruamel scalar subclasses and non-strings are returned as-is."""
+    return sys.intern(value) if type(value) is str else value
+
+def _mapping(value):
+    """`value` when it is a mapping, else the shared empty one (null, list or scalar sections)."""
+    return value if isinstance(value, dict) else _EMPTY
+
+def _ref_key(name, namespace) -> Optional[tuple]:
+    """(name, namespace) as a lookup key; None when either is unhashable (a list where a name belongs)."""
     try:
-        from models import AuditIssue
-    except ImportError:
-        from .models import AuditIssue
+        hash(name), hash(namespace)
+    except TypeError:
+        return None
+    return (name, namespace)
+
+def _may_hold_resources(content: str) -> bool:
+    """Only documents with a 'kind' key are registered, so text that never spells it (Helm values,
+    empty files) can be skipped without a parse."""
+    return 'kind' in content
 
 class Synapse:
-    def __init__(self):
-        """Initializes the correlation engine with Round-Trip YAML support."""
-        self.yaml = YAML(typ='rt')
-        self.yaml.preserve_quotes = True
-        self.yaml.allow_duplicate_keys = True
-        
+    def __init__(self, shield=None):
+        """Initializes the correlation engine's resource registry; `shield` shares an existing Shield."""
         # Resource Registry
         self.all_docs = []
         self.producers = []      # Workloads (Deployments/Pods)
@@ -34,148 +52,207 @@ class Synapse:
         self.configs = []        # ConfigMaps/Secrets
         self.hpas = []           # HPAs
         self.netpols = []        # Network Policies
+        self._label_index = None  # Built by audit() once the registry is complete
+        self._ns_index = {}
+        self._shield = shield if shield is not None else Shield()  # Shield keeps no per-scan state
 
     def get_line(self, doc, key=None):
-        """Extract line from ruamel.yaml object (Shield-compatible)."""
-        try:
-            if not doc:
-                return 1
-            if key and hasattr(doc, 'lc') and hasattr(doc.lc, 'data') and key in doc.lc.data:
-                return doc.lc.data[key][0] + 1
-            if hasattr(doc, 'lc') and hasattr(doc.lc, 'line'):
-                return doc.lc.line + 1
+        """Extract line from a document carrying `lc` line data (Shield-compatible)."""
+        if not doc:
             return 1
-        except Exception:
+        lc = getattr(doc, 'lc', None)
+        if lc is None:
             return 1
+        if key:
+            data = getattr(lc, 'data', None)
+            if data is not None and key in data:
+                return data[key][0] + 1
+        line = getattr(lc, 'line', None)
+        return line + 1 if line is not None else 1
+
+    def scan_file(self, file_path: str, docs: Optional[list] = None):
+        """Reads a manifest from disk and hands it to scan_content; pre-parsed `docs` skip the read."""
+        if docs is not None:
+            self.scan_docs(file_path, docs)
+            return
+        try:
+            content = read_manifest(file_path)  # mmap-backed for large bundles
+        except (OSError, UnicodeDecodeError):
+            return
+        self.scan_content(file_path, content)
 
-    def scan_file(self, file_path: str):
-        """Deep-scans YAML, preserving document references."""
+    def scan_content(self, file_path: str, content: str):
+        """Deep-scans YAML text already in memory, preserving document references."""
         try:
-            fname = os.path.basename(file_path)
-            if not os.path.exists(file_path):
+            if not _may_hold_resources(content):
                 return
+            # Read-only: libyaml with ruamel-style line data instead of a round-trip parse
+            docs = load_stream(content)
+        except (YAMLError, ValueError):
+            return  # Unparseable text or an unconstructible scalar (bad timestamp, base64, ...)
+        self.scan_docs(file_path, docs)
 
-            with open(file_path, 'r') as f:
-                content = f.read()
-                if not content.strip():
-                    return
-                    
-                docs = list(self.yaml.load_all(content))
+    def scan_docs(self, file_path: str, docs: list):
+        """Registers documents the caller already parsed (any loader that provides `lc`)."""
+        # Issues carry the path as given, so same-named manifests in different directories stay apart
+        for doc in docs:
+            try:
+                self._register(file_path, doc)
+            except (AttributeError, TypeError, KeyError):
+                pass  # Malformed document (e.g. a list where a mapping belongs): keep the file's other documents
+
+    def _register(self, fname: str, doc):
+        """Adds one parsed document to the registry buckets it belongs to."""
+        if not doc or not isinstance(doc, dict) or not isinstance(doc.get('kind'), str):
+            return
+
+        # A handful of kinds and namespaces recur across every registry record and index
+        kind = _interned(doc['kind'])
+        metadata = _mapping(doc.get('metadata'))
+        name = metadata.get('name', 'unknown')
+        ns = _interned(metadata.get('namespace', 'default'))
+        spec = _mapping(doc.get('spec'))
+        spec_line = self.get_line(doc, 'spec')  # Where audit() anchors this resource's findings
+
+        # --- 1. Workload Processing (Deployments, Pods, CronJobs, etc.) ---
+        if kind in _WORKLOAD_KINDS:
+            # 1a. Extract Pod Spec and Metadata based on Kind
+            if kind == 'Pod':
+                t_metadata = metadata
+                p_spec = spec
+            elif kind == 'CronJob':
+                job_spec = _mapping(_mapping(spec.get('jobTemplate')).get('spec'))
+                template = _mapping(job_spec.get('template'))
+                t_metadata = _mapping(template.get('metadata'))
+                p_spec = _mapping(template.get('spec'))
+            else:
+                template = _mapping(spec.get('template'))
+                t_metadata = _mapping(template.get('metadata'))
+                p_spec = _mapping(template.get('spec'))
+
+            labels = _mapping(t_metadata.get('labels'))
+            containers = p_spec.get('containers') or []
             
-            for doc in docs:
-                if not doc or not isinstance(doc, dict) or 'kind' not in doc:
-                    continue
-                
-                doc['_origin_file'] = fname
-                self.all_docs.append(doc)
+            # 1b. Map Ports and Probes
+            c_ports = []
+            probes = []
+            for c in containers:
+                for p in c.get('ports') or []:
+                    if p.get('containerPort'):
+                        c_ports.append(str(p.get('containerPort')))
+                    if p.get('name'):
+                        c_ports.append(p.get('name'))
                 
-                kind = doc['kind']
-                metadata = doc.get('metadata', {})
-                name = metadata.get('name', 'unknown')
-                ns = metadata.get('namespace', 'default')
-                spec = doc.get('spec', {}) or {}
- 
-                # --- 1. Workload Processing (Deployments, Pods, CronJobs, etc.) ---
-                workloads = ['Deployment', 'Pod', 'StatefulSet', 'DaemonSet', 'CronJob', 'Job']
-                if kind in workloads:
-                    self.workload_docs.append(doc)
-                    
-                    # 1a. Extract Pod Spec and Metadata based on Kind
-                    if kind == 'Pod':
-                        t_metadata = metadata
-                        p_spec = spec
-                    elif kind == 'CronJob':
-                        job_spec = spec.get('jobTemplate', {}).get('spec', {})
-                        template = job_spec.get('template', {})
-                        t_metadata = template.get('metadata', {})
-                        p_spec = template.get('spec', {})
-                    else:
-                        template = spec.get('template', {})
-                        t_metadata = template.get('metadata', {})
-                        p_spec = template.get('spec', {})
-
-                    labels = t_metadata.get('labels') or {}
-                    containers = p_spec.get('containers') or []
-                    
-                    # 1b. Map Ports and Probes
-                    c_ports = []
-                    probes = []
-                    for c in containers:
-                        for p in c.get('ports') or []:
-                            if p.get('containerPort'):
-                                c_ports.append(str(p.get('containerPort')))
-                            if p.get('name'):
-                                c_ports.append(p.get('name'))
-                        
-                        for p_type in ['livenessProbe', 'readinessProbe', 'startupProbe']:
-                            p_data = c.get(p_type)
-                            if p_data and 'httpGet' in p_data:
-                                probes.append({
-                                    'type': p_type, 
-                                    'port': str(p_data['httpGet'].get('port')),
-                                    'path': p_data['httpGet'].get('path')
-                                })
-
-                    # 1c. Register as Producer
-                    self.producers.append({
-                        'name': name, 
-                        'kind': kind, 
-                        'labels': labels, 
-                        'namespace': ns,
-                        'ports': c_ports, 
-                        'probes': probes, 
-                        'file': fname,
-                        'volumes': p_spec.get('volumes') or [], 
-                        'raw_doc': doc
-                    })
-
-                # --- 2. Service Processing ---
-                elif kind == 'Service':
-                    self.consumers.append({
-                        'name': name, 'namespace': ns, 'file': fname,
-                        'selector': spec.get('selector') or {},
-                        'ports': spec.get('ports') or [],
-                        'type': spec.get('type', 'ClusterIP'),
-                        'raw_doc': doc
-                    })
-
-                # --- 3. Other Resources ---
-                elif kind == 'Ingress':
-                    self.ingresses.append({
-                        'name': name, 'namespace': ns, 'file': fname,
-                        'spec': spec, 'raw_doc': doc
-                    })
-                elif kind == 'HorizontalPodAutoscaler':
-                    self.hpas.append({
-                        'name': name, 'namespace': ns, 'file': fname, 'doc': doc
-                    })
-                elif kind in ['ConfigMap', 'Secret']:
-                    self.configs.append({
-                        'name': name, 'kind': kind, 'namespace': ns, 'file': fname
-                    })
-                elif kind == 'NetworkPolicy':
-                    self.netpols.append({
-                        'name': name, 'namespace': ns, 'file': fname,
-                        'selector': spec.get('podSelector', {}).get('matchLabels') or {}
-                    })
-
-        except Exception:
-            pass
+                for p_type in _PROBE_TYPES:
+                    p_data = c.get(p_type)
+                    if p_data and 'httpGet' in p_data:
+                        probes.append({
+                            'type': p_type, 
+                            'port': str(p_data['httpGet'].get('port')),
+                            'path': p_data['httpGet'].get('path')
+                        })
+
+            # 1c. Register as Producer
+            self.workload_docs.append(doc)
+            self.producers.append({
+                'name': name, 
+                'kind': kind, 
+                'labels': labels, 
+                'namespace': ns,
+                'ports': c_ports, 
+                'port_set': frozenset(str(x) for x in c_ports),  # Membership tests in audit()
+                'probes': probes, 
+                'file': fname,
+                'volumes': p_spec.get('volumes') or [], 
+                'spec_line': spec_line,
+                'raw_doc': doc
+            })
+
+        # --- 2. Service Processing ---
+        elif kind == 'Service':
+            s_ports = spec.get('ports')
+            s_ports = [sp for sp in s_ports if isinstance(sp, dict)] if isinstance(s_ports, list) else []
+            targets = (sp.get('targetPort') for sp in s_ports)
+            self.consumers.append({
+                'name': name, 'namespace': ns, 'file': fname,
+                'selector': _mapping(spec.get('selector')),
+                'ports': s_ports,
+                'target_ports': tuple(str(t) for t in targets if t),  # As audit() compares them to port_set
+                'type': spec.get('type', 'ClusterIP'),
+                'spec_line': spec_line,
+                'selector_line': self.get_line(doc, 'selector')
+            })
+
+        # --- 3. Other Resources ---
+        elif kind == 'Ingress':
+            self.ingresses.append({
+                'name': name, 'namespace': ns, 'file': fname,
+                'spec': spec, 'spec_line': spec_line
+            })
+        elif kind == 'HorizontalPodAutoscaler':
+            self.hpas.append({
+                'name': name, 'namespace': ns, 'file': fname, 'doc': doc
+            })
+        elif kind in _CONFIG_KINDS:
+            self.configs.append({
+                'name': name, 'kind': kind, 'namespace': ns, 'file': fname
+            })
+        elif kind == 'NetworkPolicy':
+            self.netpols.append({
+                'name': name, 'namespace': ns, 'file': fname,
+                'selector': _mapping(_mapping(spec.get('podSelector')).get('matchLabels'))
+            })
+
+        # Only a fully extracted document joins the registry that audit() re-scans with Shield
+        doc['_origin_file'] = fname
+        self.all_docs.append(doc)
+
+    def _build_label_index(self):
+        """Inverted index over producers: (label, value) -> producer positions, plus namespace -> positions."""
+        self._label_index = {}
+        self._ns_index = {}
+        for idx, p in enumerate(self.producers):
+            try:
+                self._ns_index.setdefault(p['namespace'], set()).add(idx)
+                for pair in p['labels'].items():
+                    self._label_index.setdefault(pair, set()).add(idx)
+            except (TypeError, AttributeError):
+                self._label_index = None  # Malformed labels or unhashable labels/namespace: fall back to linear matching
+                return
+
+    def _selected_producers(self, selector, namespace) -> list:
+        """Producers in `namespace` whose labels contain every selector pair, in registration order."""
+        if self._label_index is not None:
+            try:
+                hits = self._ns_index.get(namespace, set())
+                for pair in selector.items():
+                    hits = hits & self._label_index.get(pair, set())
+                    if not hits:
+                        break
+                return [self.producers[idx] for idx in sorted(hits)]
+            except TypeError:
+                pass  # Unhashable selector value: no index entry can match it exactly
+        return [p for p in self.producers
+                if p['namespace'] == namespace and selector.items() <= p['labels'].items()]
 
     def audit(self) -> List[AuditIssue]:
         """Complete correlation suite across manifest graph."""
-        try:
-            from shield import Shield
-        except ImportError:
-            return []
-            
         results = []
-        shield = Shield()
+        shield = self._shield
+        self._build_label_index()
+        # First Service per (name, namespace), as the linear lookup returned, and the defined config refs
+        # Unhashable names are never a valid reference target, so they get no key
+        services = {}
+        for svc in self.consumers:
+            key = _ref_key(svc['name'], svc['namespace'])
+            if key is not None:
+                services.setdefault(key, svc)
+        config_refs = {_ref_key(c['name'], c['namespace']) for c in self.configs}
+        config_refs.discard(None)
 
         # --- A. DEEP SCAN (Shield logic) ---
-        # Runs individual resource audits (API version, Security Context, etc.)
-        for doc in self.all_docs:
-            findings = shield.scan(doc, self.all_docs)
+        # Shield's registry-wide checks (HPA targets); per-resource audits run per file in the CLI
+        for doc, findings in shield.scan_all(self.all_docs):
             for f in findings:
                 results.append(AuditIssue(
                     code=f['code'], severity=f['severity'], 
@@ -186,19 +263,18 @@ class Synapse:
 
         # --- B. CROSS-RESOURCE CORRELATIONS (Synapse logic) ---
 
+        # Each Service's selected workloads, shared by the GHOST and port alignment checks
+        selections = [self._selected_producers(svc['selector'], svc['namespace']) for svc in self.consumers]
+
         # 1. GHOST SERVICE: Service exists but selects no pods
-        for svc in self.consumers:
+        for svc, selected in zip(self.consumers, selections):
             selector = svc.get('selector')
             if not selector: continue
                 
-            matches = [p for p in self.producers 
-                      if p['namespace'] == svc['namespace'] and 
-                      selector.items() <= p['labels'].items()]
-            
-            if not matches:
+            if not selected:
                 results.append(AuditIssue(
                     code="GHOST", severity=shield.HIGH, file=svc['file'],
-                    line=self.get_line(svc['raw_doc'], 'selector'),
+                    line=svc['selector_line'],
                     message=f"GHOST SERVICE: Service '{svc['name']}' selector matches 0 pods.",
                     fix="Align Service 'spec.selector' with Deployment labels.",
                     source="Synapse"
@@ -207,25 +283,24 @@ class Synapse:
         # 2. INGRESS -> SERVICE VALIDATION
         # Validates that the Ingress points to a real service and correct port
         for ing in self.ingresses:
-            rules = ing['spec'].get('rules') or []
-            for rule in rules:
-                paths = rule.get('http', {}).get('paths') or []
-                for path in paths:
-                    backend = path.get('backend', {})
-                    svc_node = backend.get('service', backend)
+            rules = ing['spec'].get('rules')
+            for rule in rules if isinstance(rules, list) else ():
+                paths = _mapping(_mapping(rule).get('http')).get('paths')
+                for path in paths if isinstance(paths, list) else ():
+                    backend = _mapping(_mapping(path).get('backend'))
+                    svc_node = _mapping(backend.get('service', backend))
                     s_name = svc_node.get('name') or backend.get('serviceName')
                     
                     p_node = svc_node.get('port', {})
                     t_port = p_node.get('number') if isinstance(p_node, dict) else p_node
 
                     if s_name:
-                        match = next((s for s in self.consumers 
-                                    if s['name'] == s_name and s['namespace'] == ing['namespace']), None)
+                        match = services.get(_ref_key(s_name, ing['namespace']))
                         if not match:
                             results.append(AuditIssue(
                                 code="INGRESS_ORPHAN", severity=shield.HIGH, 
                                 file=ing['file'],
-                                line=self.get_line(ing['raw_doc'], 'spec'),
+                                line=ing['spec_line'],
                                 message=f"Ingress backend references missing Service '{s_name}'.",
                                 fix="Ensure Service exists in same namespace.",
                                 source="Synapse"
@@ -235,26 +310,29 @@ class Synapse:
                             # Check both numeric and named ports
                             s_names = [p.get('name') for p in match.get('ports', [])]
                             if t_port not in s_ports and t_port not in s_names:
+                                exposed = s_ports + s_names  # Rendered once for both message and fix
                                 results.append(AuditIssue(
                                     code="INGRESS_PORT_MISMATCH", severity=shield.CRITICAL,
                                     file=ing['file'],
-                                    line=self.get_line(ing['raw_doc'], 'spec'),
-                                    message=f"Ingress targets port {t_port}, Service '{s_name}' exposes {s_ports + s_names}.",
-                                    fix=f"Update Ingress port to match one of: {s_ports + s_names}",
+                                    line=ing['spec_line'],
+                                    message=f"Ingress targets port {t_port}, Service '{s_name}' exposes {exposed}.",
+                                    fix=f"Update Ingress port to match one of: {exposed}",
                                     source="Synapse"
                                 ))
 
         # 3. VOLUME MOUNT CONSISTENCY
         for p in self.producers:
-            for vol in p.get('volumes') or []:
+            volumes = p.get('volumes')
+            for vol in volumes if isinstance(volumes, list) else ():
+                vol = _mapping(vol)
                 ref = None
-                if 'configMap' in vol: ref = vol['configMap'].get('name')
-                if 'secret' in vol: ref = vol['secret'].get('secretName')
+                if 'configMap' in vol: ref = _mapping(vol['configMap']).get('name')
+                if 'secret' in vol: ref = _mapping(vol['secret']).get('secretName')
                 
-                if ref and not any(c['name'] == ref and c['namespace'] == p['namespace'] for c in self.configs):
+                if ref and _ref_key(ref, p['namespace']) not in config_refs:
                     results.append(AuditIssue(
                         code="VOL_MISSING", severity=shield.MEDIUM, file=p['file'],
-                        line=self.get_line(p['raw_doc'], 'spec'),
+                        line=p['spec_line'],
                         message=f"Workload '{p['name']}' mounts missing '{ref}'.",
                         fix="Define ConfigMap/Secret in same namespace.",
                         source="Synapse"
@@ -263,11 +341,10 @@ class Synapse:
         # 4. PROBE PORT INTEGRITY
         for p in self.producers:
             for probe in p.get('probes'):
-                valid_ports = [str(x) for x in p['ports']]
-                if probe['port'] and probe['port'] not in valid_ports:
+                if probe['port'] and probe['port'] not in p['port_set']:
                     results.append(AuditIssue(
                         code="PROBE_GAP", severity=shield.MEDIUM, file=p['file'],
-                        line=self.get_line(p['raw_doc'], 'spec'),
+                        line=p['spec_line'],
                         message=f"Probe targets port '{probe['port']}' not in containerPorts.",
                         fix="Expose probe port in container 'ports' section.",
                         source="Synapse"
@@ -275,19 +352,17 @@ class Synapse:
 
         # 5. SERVICE -> WORKLOAD PORT ALIGNMENT
         
-        for svc in self.consumers:
-            for p in self.producers:
-                if p['namespace'] == svc['namespace'] and svc['selector'].items() <= p['labels'].items():
-                    for s_port in svc['ports']:
-                        target = s_port.get('targetPort')
-                        if target and str(target) not in p['ports']:
-                            results.append(AuditIssue(
-                                code="PORT_MISMATCH", severity=shield.MEDIUM, 
-                                file=svc['file'],
-                                line=self.get_line(svc['raw_doc'], 'spec'),
-                                message=f"Service '{svc['name']}' targets port {target}, workload '{p['name']}' missing it.",
-                                fix=f"Add port {target} to {p['kind']} containerPorts.",
-                                source="Synapse"
-                            ))
+        for svc, selected in zip(self.consumers, selections):
+            for p in selected:
+                for target in svc['target_ports']:
+                    if target not in p['port_set']:
+                        results.append(AuditIssue(
+                            code="PORT_MISMATCH", severity=shield.MEDIUM, 
+                            file=svc['file'],
+                            line=svc['spec_line'],
+                            message=f"Service '{svc['name']}' targets port {target}, workload '{p['name']}' missing it.",
+                            fix=f"Add port {target} to {p['kind']} containerPorts.",
+                            source="Synapse"
+                        ))
 
         return results
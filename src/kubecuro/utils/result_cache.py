@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+--------------------------------------------------------------------------------
+AUTHOR:      Nishar A Sunkesala / FixMyK8s
+PURPOSE:      Persistent result cache for detect-only heals of unchanged files.
+--------------------------------------------------------------------------------
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import time
+from importlib import metadata
+from typing import Optional, Sequence, Tuple
+
+CACHE_VERSION = 1  # Bump when the shape of a cached result changes
+RACY_WINDOW_NS = 2_000_000_000  # Coarse-mtime filesystems can hide a same-size edit made this soon after a write
+
+_PKG_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_ENGINE_FILES = ('healer.py', 'shield.py', os.path.join('utils', 'yaml_io.py'))  # Everything that decides the codes
+
+def _default_path() -> str:
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'kubecuro', 'results.sqlite3')
+
+def _engine_stamp() -> list:
+    """Identity of the installed rule engines, so upgrading KubeCuro invalidates old results."""
+    stamp = [CACHE_VERSION]
+    try:
+        stamp.append(metadata.version('kubecuro'))
+    except metadata.PackageNotFoundError:
+        pass  # Running from a source tree: the engine files below still identify it
+    paths = [os.path.join(_PKG_DIR, name) for name in _ENGINE_FILES]
+    if getattr(sys, 'frozen', False):
+        paths.append(sys.executable)  # Frozen builds ship bytecode only: the binary itself identifies the release
+    for path in paths:
+        try:
+            st = os.stat(path)
+            stamp.extend((st.st_mtime_ns, st.st_size))
+        except OSError:
+            pass
+    return stamp
+
+class ResultCache:
+    """
+    Maps (path, mtime_ns, size, options) or a content digest to a heal
+    result in a small SQLite database, which stays consistent when several
+    runs share it. Any database failure disables the cache for the rest of the run.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.environ.get('KUBECURO_CACHE') or _default_path()
+        self.enabled = not os.environ.get('KUBECURO_NO_CACHE')
+        self._db = None
+        self._stamp = None
+
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._db = sqlite3.connect(self.path, timeout=5)
+            self._db.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        return self._db
+
+    def key(self, file_path: str, st: os.stat_result, options: Sequence) -> str:
+        if self._stamp is None:
+            self._stamp = _engine_stamp()
+        return json.dumps([self._stamp, os.path.abspath(file_path), st.st_mtime_ns, st.st_size, list(options)])
+
+    def content_key(self, text: str, options: Sequence) -> str:
+        """Content-addressed key: identical manifests share an entry wherever they live."""
+        if self._stamp is None:
+            self._stamp = _engine_stamp()
+        digest = hashlib.blake2b(text.encode('utf-8'), digest_size=20).hexdigest()
+        return json.dumps([self._stamp, digest, list(options)])
+
+    def get(self, key: str) -> Optional[Tuple[bool, set]]:
+        if not self.enabled:
+            return None
+        try:
+            row = self._conn().execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+        except (sqlite3.Error, OSError):
+            self.enabled = False
+            return None
+        if row is None:
+            return None
+        try:
+            changed, codes = json.loads(row[0])
+            return (changed, set(codes))
+        except (ValueError, TypeError):
+            return None  # Corrupt or old-format row: a miss, overwritten by the next put()
+
+    def put(self, key: str, changed: bool, codes: set, st: Optional[os.stat_result] = None) -> None:
+        """Stores a result; `st` marks a stat-based key, which is skipped while the file is racy."""
+        if not self.enabled:
+            return
+        # A file written moments ago may still change without moving its mtime: don't vouch for it yet
+        if st is not None and time.time_ns() - st.st_mtime_ns < RACY_WINDOW_NS:
+            return
+        try:
+            with self._conn() as db:
+                db.execute("INSERT OR REPLACE INTO results (key, value) VALUES (?, ?)",
+                           (key, json.dumps([changed, sorted(codes)])))
+        except (sqlite3.Error, OSError):
+            self.enabled = False
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+--------------------------------------------------------------------------------
+AUTHOR:      Nishar A Sunkesala / FixMyK8s
+PURPOSE:      Shared YAML I/O: libyaml-backed loaders for the read-only paths.
+--------------------------------------------------------------------------------
+"""
+import mmap
+import os
+import re
+import yaml
+from yaml.constructor import ConstructorError
+
+# libyaml C bindings are an optional part of PyYAML; fall back to the pure loader
+try:
+    from yaml import CSafeLoader as FastLoader
+except ImportError:
+    from yaml import SafeLoader as FastLoader
+
+MMAP_THRESHOLD = 64 * 1024  # Below this a plain read() is cheaper than setting up a mapping
+
+def read_manifest(file_path: str) -> str:
+    """
+    Reads a manifest as text with universal newlines, like open(..., 'r').
+    Large files are decoded straight from a read-only mmap, skipping the
+    intermediate bytes copy that a buffered read() makes.
+    """
+    text = None
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size >= MMAP_THRESHOLD:
+            try:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    text = str(mm, 'utf-8')
+            except (ValueError, OSError):
+                pass  # Not mappable (pipes, special files): fall back to a buffered read
+        if text is None:
+            text = f.read().decode('utf-8')
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+class _LineCol:
+    """Minimal stand-in for ruamel's `lc`: 0-based line/col plus per-key positions."""
+    __slots__ = ('line', 'col', 'data')
+
+    def __init__(self, line: int, col: int):
+        self.line = line
+        self.col = col
+        self.data = {}
+
+class LineMap(dict):
+    """Plain dict carrying ruamel-compatible `lc` line metadata."""
+    __slots__ = ('lc',)
+
+class LineSeq(list):
+    """Plain list carrying ruamel-compatible `lc` line metadata."""
+    __slots__ = ('lc',)
+
+class LineLoader(FastLoader):
+    """
+    Safe loader that records source positions the way ruamel's round-trip
+    loader does, so `get_line()` helpers work on either without changes.
+    Duplicate keys are rejected, matching the round-trip loader.
+    """
+    allow_duplicate_keys = False
+
+class LenientLineLoader(LineLoader):
+    """LineLoader that keeps the first value of a duplicated key, like ruamel's allow_duplicate_keys."""
+    allow_duplicate_keys = True
+
+def _construct_map(loader, node):
+    data = LineMap()
+    data.lc = _LineCol(node.start_mark.line, node.start_mark.column)
+    yield data
+    loader.flatten_mapping(node)
+    for key_node, value_node in node.value:
+        key = loader.construct_object(key_node, deep=False)
+        if key in data:
+            if loader.allow_duplicate_keys:
+                continue
+            raise ConstructorError("while constructing a mapping", node.start_mark,
+                                   f"found duplicate key {key!r}", key_node.start_mark)
+        data[key] = loader.construct_object(value_node, deep=False)
+        data.lc.data[key] = [key_node.start_mark.line, key_node.start_mark.column,
+                             value_node.start_mark.line, value_node.start_mark.column]
+
+def _construct_seq(loader, node):
+    data = LineSeq()
+    data.lc = _LineCol(node.start_mark.line, node.start_mark.column)
+    yield data
+    data.extend(loader.construct_sequence(node))
+
+LineLoader.add_constructor('tag:yaml.org,2002:map', _construct_map)
+LineLoader.add_constructor('tag:yaml.org,2002:seq', _construct_seq)
+
+# YAML 1.2 booleans, as ruamel's round-trip loader resolves them: 'yes'/'no'/'on'/'off' stay strings
+LineLoader.yaml_implicit_resolvers = {
+    first: [(tag, rx) for tag, rx in resolvers if tag != 'tag:yaml.org,2002:bool']
+    for first, resolvers in FastLoader.yaml_implicit_resolvers.items()
+}
+LineLoader.add_implicit_resolver('tag:yaml.org,2002:bool',
+                                 re.compile(r'^(?:true|True|TRUE|false|False|FALSE)$'), list('tTfF'))
+
+def fast_load(text: str):
+    """Loads a single document with libyaml (plain dicts/lists, no line data)."""
+    return yaml.load(text, Loader=FastLoader)
+
+def line_load(text: str):
+    """Loads a single document with libyaml, keeping ruamel-style `lc` line data."""
+    return yaml.load(text, Loader=LineLoader)
+
+def load_stream(text: str) -> list:
+    """
+    Loads every document of a multi-doc stream in one libyaml pass, keeping
+    `lc` line data and tolerating duplicate keys. Raises the YAML error on the
+    first defect, so one call both validates the file and yields its documents.
+    """
+    return list(yaml.load_all(text, Loader=LenientLineLoader))
@@ -0,0 +1,8 @@
+import pytest
+
+@pytest.fixture(autouse=True)
+def isolated_result_cache(tmp_path, monkeypatch):
+    """Every test gets its own result cache instead of the developer's ~/.cache/kubecuro one"""
+    monkeypatch.setenv("KUBECURO_CACHE", str(tmp_path / "kubecuro-cache" / "results.sqlite3"))
+    # Set (not deleted) so monkeypatch restores it after a test whose --no-cache run exports it
+    monkeypatch.setenv("KUBECURO_NO_CACHE", "")
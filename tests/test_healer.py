@@ -0,0 +1,139 @@
+import os
+import pytest
+from kubecuro.healer import Healer, _split_docs
+from kubecuro.utils.result_cache import ResultCache
+
+@pytest.fixture
+def healer_engine():
+    return Healer()
+
+def test_split_docs_keeps_line_accounting():
+    """Verify marker lines are dropped and every other line is kept verbatim"""
+    text = "---\na: 1\n\n--- # second\nb: 2\n---\n"
+    docs = _split_docs(text)
+    assert docs == [(None, ""), ("---", "a: 1\n\n"), ("--- # second", "b: 2\n"), ("---", "")]
+    # Each marker line plus the document lines must add back up to the source
+    assert sum(len(d.splitlines()) for _, d in docs) + 3 == len(text.splitlines())
+
+def test_commented_marker_round_trips_unchanged(healer_engine, tmp_path):
+    """Verify comments and tags on '---' lines survive, so a clean file is not rewritten"""
+    manifest = tmp_path / "tiers.yaml"
+    text = (
+        "--- # app tier\napiVersion: v1\nkind: ConfigMap\nmetadata:\n  name: app\n"
+        "--- # data tier\napiVersion: v1\nkind: ConfigMap\nmetadata:\n  name: data\n"
+    )
+    manifest.write_text(text)
+    changed, _ = healer_engine.heal_file(str(manifest))
+    assert not changed and manifest.read_text() == text
+
+    # A document the healer rewrites keeps the marker line that opened it
+    manifest.write_text(text.replace("apiVersion: v1\nkind: ConfigMap\nmetadata:\n  name: data",
+                                     "apiVersion: extensions/v1beta1\nkind: Ingress\nmetadata:\n  name: data"))
+    changed, _ = healer_engine.heal_file(str(manifest))
+    assert changed and "--- # data tier\napiVersion: networking.k8s.io/v1\n" in manifest.read_text()
+
+def test_rbac_finding_line_in_second_document(healer_engine, tmp_path):
+    """Verify findings in later documents are anchored to their absolute line"""
+    manifest = tmp_path / "rbac.yaml"
+    manifest.write_text(
+        "apiVersion: v1\nkind: ConfigMap\nmetadata:\n  name: cfg\ndata:\n  k: v\n"
+        "---\n"
+        "apiVersion: rbac.authorization.k8s.io/v1\nkind: Role\nmetadata:\n  name: reader\n"
+        "rules:\n- apiGroups: [\"\"]\n  resources: [\"secrets\"]\n  verbs: [\"get\"]\n"
+    )
+    _, codes = healer_engine.heal_file(str(manifest), dry_run=True)
+    assert "RBAC_SECRET:13" in codes
+
+def test_tab_indentation_is_expanded(healer_engine, tmp_path):
+    """Verify tab-indented documents are repaired instead of failing to parse"""
+    manifest = tmp_path / "tabs.yaml"
+    manifest.write_text("apiVersion: v1\nkind: ConfigMap\nmetadata:\n\tname: cfg\ndata:\n\tk: v\n")
+    healed, codes = healer_engine.heal_file(str(manifest), return_content=True)
+    assert healed == "apiVersion: v1\nkind: ConfigMap\nmetadata:\n  name: cfg\ndata:\n  k: v\n"
+    assert not any(c.startswith("SYNTAX_ERROR") for c in codes)
+
+def test_tab_under_list_item_keeps_nesting(healer_engine, tmp_path):
+    """Verify a tab-indented key under a list item stays inside that item and the repair is reported"""
+    manifest = tmp_path / "tab-item.yaml"
+    manifest.write_text("apiVersion: v1\nkind: Pod\nmetadata:\n  name: p\nspec:\n  containers:\n  - name: c\n\timage: busybox\n")
+    healed, codes = healer_engine.heal_file(str(manifest), return_content=True)
+    assert "  - name: c\n    image: busybox\n" in healed
+    assert "FIX_TABS_EXPANDED:8" in codes
+
+def test_duplicate_keys_still_reported(healer_engine, tmp_path):
+    """Verify the libyaml detection path rejects duplicate keys like the round-trip loader"""
+    manifest = tmp_path / "dupes.yaml"
+    manifest.write_text("apiVersion: v1\nkind: ConfigMap\nmetadata:\n  name: a\n  name: b\ndata:\n  k: v\n")
+    _, codes = healer_engine.heal_file(str(manifest), dry_run=True)
+    assert any(c.startswith("SYNTAX_ERROR") for c in codes)
+
+def test_empty_resources_is_not_a_syntax_error(healer_engine, tmp_path):
+    """Verify a container with an empty `resources:` key is flagged for OOM risk, not as broken YAML"""
+    manifest = tmp_path / "empty-res.yaml"
+    manifest.write_text(
+        "apiVersion: v1\nkind: Pod\nmetadata:\n  name: p\nspec:\n"
+        "  containers:\n  - name: c\n    image: nginx:1.25\n    resources:\n"
+    )
+    _, codes = healer_engine.heal_file(str(manifest), dry_run=True)
+    assert "OOM_RISK:7" in codes
+    assert not any(c.startswith("SYNTAX_ERROR") for c in codes)
+
+def test_checker_failure_is_reported_as_heal_skipped(healer_engine, tmp_path):
+    """Verify a document that trips a checker is reported and kept, not dropped or called a syntax error"""
+    manifest = tmp_path / "null-rule.yaml"
+    text = "apiVersion: v1\nkind: ConfigMap\nmetadata: {name: c}\n---\nkind: Role\nmetadata: {name: r}\nrules:\n- null\n"
+    manifest.write_text(text)
+    _, codes = healer_engine.heal_file(str(manifest), dry_run=True)
+    assert "HEAL_SKIPPED:5" in codes
+    assert not any(c.startswith("SYNTAX_ERROR") for c in codes)
+
+def test_yaml_11_boolean_is_not_patched(healer_engine, tmp_path):
+    """Verify `privileged: yes` is read as the YAML 1.2 string the writer sees, so no fix is claimed"""
+    manifest = tmp_path / "priv.yaml"
+    text = (
+        "apiVersion: v1\nkind: Pod\nmetadata:\n  name: p\nspec:\n  automountServiceAccountToken: false\n"
+        "  containers:\n  - name: c\n    image: nginx:1.25\n    resources:\n      limits: {cpu: 1, memory: 1Gi}\n"
+        "    securityContext:\n      privileged: yes\n"
+    )
+    manifest.write_text(text)
+    changed, codes = healer_engine.heal_file(str(manifest), apply_defaults=True)
+    assert not changed and manifest.read_text() == text
+    assert not any(c.startswith("SEC_PRIVILEGED_FIXED") for c in codes)
+
+def test_malformed_metadata_keeps_other_findings(healer_engine, tmp_path):
+    """Verify one document with scalar metadata does not discard the rest of the file's findings"""
+    manifest = tmp_path / "oops.yaml"
+    manifest.write_text(
+        "apiVersion: v1\nkind: Pod\nmetadata:\n  name: p\nspec:\n  containers:\n  - name: c\n    image: nginx:1.25\n"
+        "---\nkind: ConfigMap\nmetadata: oops\n"
+    )
+    _, codes = healer_engine.heal_file(str(manifest), dry_run=True)
+    assert "OOM_RISK:7" in codes
+
+def test_detect_only_result_is_reused_until_file_changes(healer_engine, tmp_path):
+    """Verify unchanged files are answered from the on-disk cache and edits invalidate it"""
+    healer_engine.result_cache = ResultCache(str(tmp_path / "cache" / "results.sqlite3"))
+    calls = []
+    heal_content = healer_engine.heal_content
+    healer_engine.heal_content = lambda *a: calls.append(a) or heal_content(*a)
+
+    manifest = tmp_path / "pod.yaml"
+    manifest.write_text("apiVersion: v1\nkind: Pod\nmetadata:\n  name: p\nspec:\n  containers:\n  - name: c\n    image: nginx:1.25\n")
+    os.utime(manifest, ns=(10**18, 10**18))  # Well outside the racy window
+    first = healer_engine.heal_file(str(manifest), dry_run=True)
+    assert "OOM_RISK:7" in first[1]
+    assert healer_engine.heal_file(str(manifest), dry_run=True) == first
+    assert len(calls) == 1
+
+    os.utime(manifest, ns=(10**18 + 1, 10**18 + 1))
+    healer_engine.heal_file(str(manifest), dry_run=True)
+    assert len(calls) == 2
+
+def test_unreadable_cache_row_is_a_miss(tmp_path):
+    """Verify a corrupt or old-format cache row is treated as a miss instead of raising"""
+    cache = ResultCache(str(tmp_path / "cache" / "results.sqlite3"))
+    corrupt, old = cache.content_key("a", ("audit", False)), cache.content_key("b", ("audit", False))
+    with cache._conn() as db:
+        db.execute("INSERT INTO results (key, value) VALUES (?, ?)", (corrupt, "{not json"))
+        db.execute("INSERT INTO results (key, value) VALUES (?, ?)", (old, "[true]"))
+    assert cache.get(corrupt) is None and cache.get(old) is None
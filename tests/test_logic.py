@@ -3,6 +3,8 @@ import os
 import shutil
 import pytest
 from io import StringIO
+from collections import Counter
+from pathlib import Path
 from contextlib import redirect_stdout, redirect_stderr # Added redirect_stderr
 
 # TRIPLE-CHECK: Inject src at the absolute highest priority
@@ -18,7 +20,8 @@ except Exception as e:
     print(f"DEBUG: Rich failed to load: {e}")
 
 # Now do your imports
-from kubecuro.main import main 
+from kubecuro.main import main, AuditEngineV2
+from kubecuro.utils.result_cache import ResultCache
 
 def run_kubecuro(*args):
     """Execute KubeCuro main() and capture all output streams."""
@@ -86,3 +89,82 @@ def test_checklist_command():
     result = run_kubecuro("checklist")
     output = result.stdout.upper()
     assert "CHECKLIST" in output or "LOGIC" in output
+
+def test_audit_heal_results_maps_cache_hits_and_duplicates(tmp_path):
+    """Scenario: cached, repeated, failed and unreadable manifests each get the right heal result."""
+    engine = AuditEngineV2(tmp_path, dry_run=True, yes=True, show_all=False, baseline=set())
+    cache = engine.healer.result_cache = ResultCache(str(tmp_path / "cache" / "results.sqlite3"))
+    options = ("audit", False)
+    cached, twin, broken = "kind: Pod\n", "kind: Service\n", "kind: Job\n"
+    cache.put(cache.content_key(cached, options), False, {"OOM_RISK:1"})
+
+    healed = []
+    def fake_healer(fpath, text=None):
+        healed.append(fpath)
+        if text is None or text == broken:
+            return None, []  # What _heal_one returns when a heal fails
+        return False, [f"HEALED:{fpath}"]
+    engine._silent_healer = fake_healer
+
+    paths = ["hit.yaml", "first.yaml", "copy.yaml", "broken.yaml", "unreadable.yaml"]
+    texts = [cached, twin, twin, broken, None]
+    with engine._audit_heal_results(paths, texts) as results:
+        results = list(results)
+
+    assert healed == ["first.yaml", "broken.yaml", "unreadable.yaml"]  # The copy reuses first.yaml's heal
+    assert results == [
+        (False, ["OOM_RISK:1"]),
+        (False, ["HEALED:first.yaml"]),
+        (False, ["HEALED:first.yaml"]),
+        (None, []),
+        (None, []),
+    ]
+    assert cache.get(cache.content_key(twin, options)) == (False, {"HEALED:first.yaml"})
+    assert cache.get(cache.content_key(broken, options)) is None  # Failed heals are not cached
+
+def test_audit_heal_is_detect_only(tmp_path, monkeypatch):
+    """Scenario: the audit reads only the codes, so a fixable manifest is never round-trip emitted."""
+    engine = AuditEngineV2(tmp_path, dry_run=True, yes=True, show_all=False, baseline=set())
+    fixable = Path("tests/samples/deprecated_api.yaml").read_text()
+    expected = engine.healer._heal_content(fixable, True, False, True)[1]
+    def no_dump(batch):
+        raise AssertionError("audit heal emitted a document")
+    monkeypatch.setattr(engine.healer, "_dump_batch", no_dump)
+
+    changed, codes = engine._silent_healer("deprecated_api.yaml", fixable)
+    assert changed is True
+    assert set(codes) == expected
+
+def test_audit_reports_each_code_once_per_resource(tmp_path):
+    """Scenario: Shield, Healer and Synapse findings for one resource are not reported twice."""
+    engine = AuditEngineV2(Path("tests/samples"), dry_run=True, yes=True, show_all=False, baseline=set())
+    engine.healer.result_cache = ResultCache(str(tmp_path / "cache" / "results.sqlite3"))
+    issues = engine.audit()
+    # Every sample holds at most one resource per rule, so a repeated (file, code) is a duplicate
+    repeated = [key for key, n in Counter((Path(i.file).name, i.code) for i in issues).items() if n > 1]
+    assert repeated == []
+    assert ("syntax_error.yaml", "INGRESS_ORPHAN") in {(Path(i.file).name, i.code) for i in issues}
+
+def test_no_cache_flag_writes_no_cache(tmp_path, monkeypatch):
+    """Scenario: --no-cache scans without creating the result cache file."""
+    cache_file = tmp_path / "nocache" / "results.sqlite3"
+    monkeypatch.setenv("KUBECURO_CACHE", str(cache_file))
+    result = run_kubecuro("scan", "tests/samples/deprecated_api.yaml", "--no-cache")
+    assert "API_DEPRECATED" in result.stdout.upper()
+    assert not cache_file.exists()
+
+def test_parallel_parse_matches_serial(tmp_path, monkeypatch):
+    """Scenario: manifests parsed on the process pool come back exactly as the serial parse returns them."""
+    engine = AuditEngineV2(tmp_path, dry_run=True, yes=True, show_all=False, baseline=set())
+    texts = ["kind: Pod\nmetadata:\n  name: p\n---\nkind: Service\nmetadata: {name: s}\n", "a: [\n", None,
+             "kind: ConfigMap\ndata: {k: v}\n"] * 2
+    with engine._parse_results(texts) as results:
+        serial = list(results)
+    monkeypatch.setattr(os, "cpu_count", lambda: 2)
+    with engine._parse_results(texts) as results:
+        pooled = list(results)
+
+    assert [type(r) for r in pooled] == [type(r) for r in serial]
+    assert pooled[0] == serial[0] and pooled[0][1].lc.line == serial[0][1].lc.line == 4
+    assert str(pooled[1]) == str(serial[1]) and pooled[1].problem_mark.line == 1  # The syntax finding keeps its line
+    assert pooled[2] is None
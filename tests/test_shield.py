@@ -58,6 +58,32 @@ def test_hpa_missing_requests(shield_engine):
     findings = shield_engine.scan(hpa, all_docs=[deployment, hpa])
     assert any(f['code'] == "HPA_MISSING_REQ" for f in findings)
 
+def test_hpa_target_seen_after_registry_grows(shield_engine):
+    """The cross-resource index picks up documents appended to the same all_docs list"""
+    hpa = {
+        "kind": "HorizontalPodAutoscaler",
+        "apiVersion": "autoscaling/v2",
+        "metadata": {"name": "web-hpa"},
+        "spec": {"scaleTargetRef": {"name": "web-deploy", "kind": "Deployment"}}
+    }
+    all_docs = [hpa]
+    assert any(f['code'] == "HPA_ORPHAN" for f in shield_engine.scan(hpa, all_docs=all_docs))
+
+    all_docs.append({"kind": "Deployment", "apiVersion": "apps/v1", "metadata": {"name": "web-deploy"}, "spec": {}})
+    assert not any(f['code'] == "HPA_ORPHAN" for f in shield_engine.scan(hpa, all_docs=all_docs))
+
+def test_scan_all_skips_malformed_document(shield_engine):
+    """One document that trips a checker does not stop the scan of the documents after it"""
+    all_docs = [
+        {"kind": "Deployment", "apiVersion": "apps/v1", "metadata": {"name": "broken"}, "spec": ["not", "a", "mapping"]},
+        {"kind": "HorizontalPodAutoscaler", "apiVersion": "autoscaling/v2", "metadata": {"name": "odd-hpa"}, "spec": "oops"},
+        {"kind": "HorizontalPodAutoscaler", "apiVersion": "autoscaling/v2", "metadata": {"name": "web-hpa"},
+         "spec": {"scaleTargetRef": {"name": "missing", "kind": "Deployment"}}},
+    ]
+    scanned = {doc["metadata"]["name"]: findings for doc, findings in shield_engine.scan_all(all_docs)}
+    assert "odd-hpa" not in scanned
+    assert any(f['code'] == "HPA_ORPHAN" for f in scanned["web-hpa"])
+
 def test_api_deprecation_detection(shield_engine):
     """Verify that old API versions (used by Healer) are correctly flagged"""
     old_ingress = {
@@ -0,0 +1,107 @@
+import pytest
+from kubecuro.synapse import Synapse
+
+def _workload(name, labels, ns="default"):
+    return {
+        "apiVersion": "apps/v1", "kind": "Deployment",
+        "metadata": {"name": name, "namespace": ns},
+        "spec": {"template": {"metadata": {"labels": labels}, "spec": {"containers": []}}}
+    }
+
+def test_selector_index_matches_linear_scan():
+    """Indexed selector matching keeps subset semantics, namespaces and registration order"""
+    syn = Synapse()
+    syn.scan_docs("stack.yaml", [
+        _workload("web-a", {"app": "web", "tier": "front"}),
+        _workload("db", {"app": "db"}),
+        _workload("web-b", {"app": "web"}),
+        _workload("web-prod", {"app": "web"}, ns="prod"),
+    ])
+    syn._build_label_index()
+
+    assert [p["name"] for p in syn._selected_producers({"app": "web"}, "default")] == ["web-a", "web-b"]
+    assert [p["name"] for p in syn._selected_producers({"app": "web", "tier": "front"}, "default")] == ["web-a"]
+    assert syn._selected_producers({"app": "cache"}, "default") == []
+    # An empty selector selects every workload in the namespace
+    assert [p["name"] for p in syn._selected_producers({}, "prod")] == ["web-prod"]
+
+def test_malformed_document_keeps_rest_of_file():
+    """A document that breaks registration does not drop the documents after it"""
+    syn = Synapse()
+    syn.scan_content("mixed.yaml", (
+        "kind: Deployment\nmetadata: {name: broken}\nspec: {template: []}\n"
+        "---\n"
+        "kind: Service\nmetadata: {name: web}\nspec: {selector: {app: web}}\n"
+    ))
+    assert [svc["name"] for svc in syn.consumers] == ["web"]
+
+def test_audit_reports_ghost_service():
+    """audit() runs the Shield and Synapse checks end to end, reusing one Shield across calls"""
+    syn = Synapse()
+    syn.scan_content("ghost.yaml", (
+        "apiVersion: v1\nkind: Service\nmetadata: {name: web}\nspec: {selector: {app: web}}\n"
+        "---\n"
+        "apiVersion: v1\nkind: Pod\nmetadata: {name: p, labels: {app: other}}\nspec: {containers: []}\n"
+    ))
+    shield = syn._shield
+    issues = syn.audit()
+    ghost = [i for i in issues if i.code == "GHOST"]
+    assert [(i.file, i.line, i.source) for i in ghost] == [("ghost.yaml", 1, "Synapse")]
+    assert syn.audit() == issues and syn._shield is shield
+
+def test_unconstructible_scalar_is_skipped():
+    """A value libyaml parses but cannot construct (an impossible date) skips the file instead of raising"""
+    syn = Synapse()
+    syn.scan_content("bad-date.yaml", "kind: ConfigMap\nmetadata: {name: cfg}\ndata: {created: 2020-13-45}\n")
+    assert syn.configs == []
+
+def test_unhashable_names_do_not_break_audit():
+    """List-valued names are never reference targets, and audit() still reports around them"""
+    syn = Synapse()
+    syn.scan_content("odd.yaml", (
+        "kind: Service\nmetadata: {name: [a, b]}\nspec: {selector: {app: x}}\n"
+        "---\n"
+        "kind: ConfigMap\nmetadata: {name: [cfg]}\ndata: {k: v}\n"
+        "---\n"
+        "kind: Ingress\nmetadata: {name: ing}\nspec:\n  rules:\n  - http:\n      paths:\n"
+        "      - backend: {service: {name: [a, b], port: {number: 80}}}\n"
+    ))
+    codes = [i.code for i in syn.audit() if i.source == "Synapse"]
+    assert "GHOST" in codes and "INGRESS_ORPHAN" in codes
+
+def test_unhashable_namespace_falls_back_to_linear_matching():
+    """A workload with a list-valued namespace disables the index instead of crashing audit()"""
+    syn = Synapse()
+    odd = _workload("odd", {"app": "web"})
+    odd["metadata"]["namespace"] = ["prod"]
+    syn.scan_docs("stack.yaml", [_workload("web", {"app": "web"}), odd])
+    syn._build_label_index()
+    assert syn._label_index is None
+    assert [p["name"] for p in syn._selected_producers({"app": "web"}, "default")] == ["web"]
+
+def test_document_failing_extraction_is_not_registered():
+    """A workload whose containers cannot be walked stays out of every registry bucket, all_docs included"""
+    syn = Synapse()
+    syn.scan_content("odd.yaml", (
+        "kind: Deployment\nmetadata: {name: d}\nspec: {template: {spec: {containers: [null]}}}\n"
+        "---\nkind: Service\nmetadata: {name: web}\nspec: {selector: {app: web}}\n"
+    ))
+    assert [doc["kind"] for doc in syn.all_docs] == ["Service"]
+    assert syn.workload_docs == [] and syn.producers == []
+
+_SERVICE = "---\nkind: Service\nmetadata: {name: web}\nspec: {selector: {app: web}}\n"
+
+@pytest.mark.parametrize("manifest", [
+    "kind: Pod\nmetadata:\nspec: {containers: []}\n",
+    "kind: Deployment\nmetadata: {name: d}\nspec:\n- a\n",
+    "kind: Service\nmetadata: {name: s}\nspec: hello\n",
+    "kind: [Pod]\nmetadata: {name: p}\n",
+    "kind: Role\nmetadata: {name: r}\nrules:\n- null\n",
+    "kind: Ingress\nmetadata: {name: i}\nspec:\n  rules:\n  - host: a\n    http:\n",
+], ids=["empty-metadata", "spec-list", "spec-string", "kind-list", "null-rule", "null-http"])
+def test_malformed_but_parseable_manifest_does_not_break_audit(manifest):
+    """Shape errors inside a parseable manifest never escape audit(), and the file's other documents still report"""
+    syn = Synapse()
+    syn.scan_content("odd.yaml", manifest + _SERVICE)
+    assert all(isinstance(doc.get("kind"), str) for doc in syn.all_docs)
+    assert "GHOST" in [i.code for i in syn.audit()]